@@ -3,92 +3,189 @@ CryptoQuant Signal Bot - Main Entry Point
 """
 
 import asyncio
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
 import sys
-import io
 
 from dotenv import load_dotenv
-import discord
-from discord.ext import commands
 
-# load_dotenv() works locally (reads .env file)
-# On Railway it does nothing — Railway injects variables directly into os.getenv()
-load_dotenv()
+LOG_FORMAT = '%(asctime)s [%(levelname)s] %(name)s: %(message)s'
 
-# Initialize database for multi-server support
-import db
-db.init_db()
 
-# ── UTF-8 safe logging ──
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] %(name)s: %(message)s',
-    handlers=[
+def setup_logging():
+    """Route all logging through a queue drained by a background listener thread."""
+    # ── UTF-8 safe logging ──
+    # Line-buffered so piped stdout (Railway) streams each record instead of bursting
+    sys.stdout.reconfigure(encoding='utf-8', line_buffering=True)
+    # Log calls only enqueue; a background listener thread does the file/stdout writes
+    # so disk I/O never blocks the event loop
+    log_queue = queue.SimpleQueue()  # unbounded, lighter put() than Queue
+    listener = logging.handlers.QueueListener(
+        log_queue,
         logging.FileHandler('bot.log', encoding='utf-8'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+        logging.StreamHandler(sys.stdout),
+        respect_handler_level=True,
+    )
+    listener.start()
+    atexit.register(listener.stop)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format=LOG_FORMAT,
+        handlers=[logging.handlers.QueueHandler(log_queue)]
+    )
+
+
 logger = logging.getLogger('CryptoSignalBot')
 
-intents = discord.Intents.default()
-intents.message_content = True
+
+# Everything with side effects sits behind __main__ checks: worker processes
+# (forkserver/spawn) re-import this file as __mp_main__ and must get only definitions
+if __name__ == '__main__':
+    # load_dotenv() works locally (reads .env file)
+    # On Railway it does nothing — Railway injects variables directly into os.getenv()
+    load_dotenv()
+    # Stdlib-only, so the token check below can report through the normal log format
+    setup_logging()
+
+    # Fail fast on a bad deploy, before paying for discord/aiohttp/cog imports
+    if not os.getenv('DISCORD_TOKEN'):
+        logger.critical("DISCORD_TOKEN not found! Make sure it is set in Railway Variables!")
+        sys.exit(1)
+
+import aiohttp
+import discord
+from discord.ext import commands
+from discord.ext.commands.errors import CommandRegistrationError, ExtensionFailed
+
+# Database for multi-server support (schema is created in setup_hook)
+import db
+
+# Only what the cogs consume: guild/channel state + prefix commands in guild text channels
+intents = discord.Intents.none()
 intents.guilds = True
+intents.guild_messages = True
+intents.message_content = True
+
+COMMAND_PREFIX = '!'
+
+# Eager cogs load in setup_hook; lazy ones load in the background once the gateway is up
+EAGER_COGS = ['cogs.signal_engine', 'cogs.admin']
+LAZY_COGS  = ['cogs.liquidation_monitor', 'cogs.ai_engine', 'cogs.ml_trainer']
+COG_LOAD_TIMEOUT = 30  # seconds per cog
+
+# Built once and sent with every IDENTIFY, so reconnects keep it without change_presence
+WATCHING_ACTIVITY = discord.Activity(
+    type=discord.ActivityType.watching,
+    name="Scanning 1000 Markets..."
+)
 
-COGS = ['cogs.signal_engine', 'cogs.liquidation_monitor', 'cogs.admin', 'cogs.ai_engine', 'cogs.ml_trainer']
 
-bot = commands.Bot(command_prefix='!', intents=intents)
+class CryptoBot(commands.Bot):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # Cogs can derive children from this (bot.logger.getChild(...)) instead of a name lookup
+        self.logger = logger
+        self._ready_once = False
+        self._lazy_cogs_task = None
 
-async def load_cogs():
-    """Load all cogs, with helpful error messages for common failures."""
-    import traceback
-    from discord.ext.commands.errors import CommandRegistrationError, ExtensionFailed
+    async def process_commands(self, message):
+        # Most messages aren't commands — reject them before discord.py builds a Context
+        if message.author.bot or not message.content.startswith(COMMAND_PREFIX):
+            return
+        await super().process_commands(message)
 
-    for cog in COGS:
-        try:
-            await bot.load_extension(cog)
-            logger.info(f'Loaded cog: {cog}')
-        except ExtensionFailed as e:
-            cause = e.original if hasattr(e, 'original') else e
-            if isinstance(cause, CommandRegistrationError):
+    async def load_cogs(self, cogs: list):
+        """Load cogs, with helpful error messages for common failures."""
+        # Load concurrently; a hung cog times out instead of stalling the rest
+        results = await asyncio.gather(
+            *(asyncio.wait_for(self.load_extension(cog), timeout=COG_LOAD_TIMEOUT) for cog in cogs),
+            return_exceptions=True
+        )
+        for cog, e in zip(cogs, results):
+            if e is None:
+                logger.info('Loaded cog: %s', cog)
+            elif isinstance(e, ExtensionFailed) and isinstance(e.original, CommandRegistrationError):
                 logger.error(
-                    f'Failed to load {cog}: duplicate command name "{cause.name}". '
-                    f'Rename one of them in the cog file to fix this.'
+                    'Failed to load %s: duplicate command name "%s". '
+                    'Rename one of them in the cog file to fix this.', cog, e.original.name
                 )
+            elif isinstance(e, asyncio.TimeoutError):
+                logger.error('Failed to load cog %s: timed out after %ss', cog, COG_LOAD_TIMEOUT)
             else:
-                logger.error(f'Failed to load cog {cog}:\n{traceback.format_exc()}')
-        except Exception:
-            logger.error(f'Failed to load cog {cog}:\n{traceback.format_exc()}')
-
-@bot.event
-async def setup_hook():
-    await load_cogs()
-
-@bot.event
-async def on_ready():
-    logger.info(f'Bot connected as {bot.user} (ID: {bot.user.id})')
-    logger.info(f'Connected to {len(bot.guilds)} guilds')
-    for guild in bot.guilds:
-        db.upsert_guild(guild.id, guild.name)
-    await bot.change_presence(activity=discord.Activity(
-        type=discord.ActivityType.watching,
-        name="Scanning 1000 Markets..."
-    ))
-
-@bot.event
-async def on_guild_join(guild):
-    logger.info(f'Joined guild: {guild.name} (ID: {guild.id})')
-    db.upsert_guild(guild.id, guild.name)
-
-@bot.event
-async def on_guild_remove(guild):
-    logger.info(f'Removed from guild: {guild.name} (ID: {guild.id})')
-    db.delete_guild(guild.id)
+                # exc_info hands the traceback to the handler, which only renders it for emitted records
+                logger.error('Failed to load cog %s:', cog, exc_info=e)
 
-if __name__ == '__main__':
-    token = os.getenv('DISCORD_TOKEN')
-    if not token:
-        logger.error("DISCORD_TOKEN not found! Make sure it is set in Railway Variables!")
-        exit(1)
+    async def setup_hook(self):
+        # Schema setup runs off the event loop instead of blocking at import time
+        await asyncio.to_thread(db.init_db)
+        # One pooled keep-alive session shared by every cog (saves TCP+TLS per call)
+        # ThreadedResolver avoids aiodns DNS failures on Windows
+        self.http_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=100, limit_per_host=20, keepalive_timeout=75, ttl_dns_cache=300,
+                resolver=aiohttp.resolver.ThreadedResolver(),
+            ),
+            # Default for callers that don't pass their own (DataFetcher's Binance/CMC calls)
+            timeout=aiohttp.ClientTimeout(total=30),
+        )
+        await self.load_cogs(EAGER_COGS)
+
+    async def on_ready(self):
+        # on_ready re-fires on every gateway reconnect — do the one-time work once
+        if self._ready_once:
+            logger.info('Gateway reconnected as %s', self.user)
+            return
+        self._ready_once = True
+
+        logger.info('Bot connected as %s (ID: %s)', self.user, self.user.id)
+        guilds = self.guilds  # builds a fresh list each access — snapshot once
+        logger.info('Connected to %d guilds', len(guilds))
+        # Rows are built on the loop (guild objects live there); the sqlite write runs off it
+        rows = [(guild.id, guild.name) for guild in guilds]
+        await asyncio.to_thread(db.upsert_guilds_bulk, rows)
+        self._lazy_cogs_task = asyncio.create_task(self.load_cogs(LAZY_COGS))
+
+    async def on_guild_join(self, guild):
+        logger.info('Joined guild: %s (ID: %s)', guild.name, guild.id)
+        # sqlite call off the event loop so guild-join storms don't stall the gateway
+        await asyncio.to_thread(db.upsert_guild, guild.id, guild.name)
+
+    async def on_guild_remove(self, guild):
+        logger.info('Removed from guild: %s (ID: %s)', guild.name, guild.id)
+        await asyncio.to_thread(db.delete_guild, guild.id)
+
+    async def close(self):
+        await super().close()
+        # Shared HTTP session outlives the cogs — close it after they unload
+        session = getattr(self, 'http_session', None)
+        if session and not session.closed:
+            await session.close()
+
+
+def main():
     logger.info("DISCORD_TOKEN found! Starting bot...")
-    bot.run(token, log_handler=None)
+    # No message/member caches — nothing reads them, and they cost RSS per guild
+    bot = CryptoBot(
+        command_prefix=COMMAND_PREFIX,
+        intents=intents,
+        max_messages=None,
+        member_cache_flags=discord.MemberCacheFlags.none(),
+        chunk_guilds_at_startup=False,
+        activity=WATCHING_ACTIVITY,
+    )
+    # libuv-backed event loop on Linux (Railway); Windows falls back to the default loop
+    try:
+        import uvloop
+        uvloop.install()
+        logger.info("Using uvloop event loop")
+    except ImportError:
+        pass
+    bot.run(os.environ['DISCORD_TOKEN'], log_handler=None)
+
+
+if __name__ == '__main__':
+    main()
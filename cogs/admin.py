@@ -1,6 +1,8 @@
 """
 Admin Cog - Bot management and channel setup (Multi-Server)
 """
+import asyncio
+
 import discord
 from discord.ext import commands
 import logging
@@ -9,10 +11,21 @@ import db
 
 logger = logging.getLogger("Admin")
 
+SIGNAL_CATEGORY = "📊 CRYPTO SIGNALS"
+
 
 class Admin(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self._engine = None  # cleared by SignalEngine.cog_unload
+
+    @property
+    def engine(self):
+        """SignalEngine cog, looked up once and memoized"""
+        e = self._engine
+        if e is None:
+            e = self._engine = self.bot.cogs.get("SignalEngine")
+        return e
 
     @commands.command(name="setup")
     @commands.has_permissions(administrator=True)
@@ -21,9 +34,9 @@ class Admin(commands.Cog):
         await ctx.send("⏳ Setting up channels for this server, please wait...")
         guild = ctx.guild
 
-        category = discord.utils.get(guild.categories, name="📊 CRYPTO SIGNALS")
+        category = next((c for c in guild.categories if c.name == SIGNAL_CATEGORY), None)
         if not category:
-            category = await guild.create_category("📊 CRYPTO SIGNALS")
+            category = await guild.create_category(SIGNAL_CATEGORY)
 
         channels_config = [
             ("⚡-scalp-signals",    "scalp"),
@@ -33,17 +46,37 @@ class Admin(commands.Cog):
             ("📋-bot-logs",          "log"),
         ]
 
+        # guild.text_channels rebuilds a sorted list per access — read it once
+        text_channels = guild.text_channels
+        existing_by_name = {c.name: c for c in reversed(text_channels)}  # first match wins, like utils.get
+        to_create = [ch_name for ch_name, _ in channels_config if ch_name not in existing_by_name]
+
+        # Create all missing channels concurrently (discord.py handles rate limits)
+        created = await asyncio.gather(*[
+            guild.create_text_channel(ch_name, category=category) for ch_name in to_create
+        ])
+        created_by_name = dict(zip(to_create, created))
+
+        embed = discord.Embed(
+            title="✅ Server Setup Complete!",
+            description=f"**{guild.name}** is now configured! Signals will start appearing automatically.",
+            color=0x1565C0
+        )
+
+        # One pass: resolve each channel and add its embed field directly
         channel_ids = {}
-        results = []
         for ch_name, key in channels_config:
-            existing = discord.utils.get(guild.text_channels, name=ch_name)
-            if existing:
-                channel_ids[key] = existing.id
-                results.append((key, existing.id, ch_name, "already existed"))
-            else:
-                ch = await guild.create_text_channel(ch_name, category=category)
-                channel_ids[key] = ch.id
-                results.append((key, ch.id, ch_name, "created ✅"))
+            ch = existing_by_name.get(ch_name)
+            status = "already existed"
+            if ch is None:
+                ch = created_by_name[ch_name]
+                status = "created ✅"
+            channel_ids[key] = ch.id
+            embed.add_field(
+                name=f"#{ch_name} ({status})",
+                value=f"<#{ch.id}>",
+                inline=False
+            )
 
         # Save to database — no .env needed
         db.save_guild_channels(
@@ -55,18 +88,8 @@ class Admin(commands.Cog):
             liq_id     = channel_ids["liquidation"],
             log_id     = channel_ids["log"],
         )
+        self.bot.dispatch("guild_configured", guild.id, channel_ids["log"])
 
-        embed = discord.Embed(
-            title="✅ Server Setup Complete!",
-            description=f"**{guild.name}** is now configured! Signals will start appearing automatically.",
-            color=0x1565C0
-        )
-        for key, ch_id, ch_name, status in results:
-            embed.add_field(
-                name=f"#{ch_name} ({status})",
-                value=f"<#{ch_id}>",
-                inline=False
-            )
         embed.set_footer(text="No need to edit any files — this server is ready to go!")
         await ctx.send(embed=embed)
         logger.info(f"Setup complete for guild: {guild.name} ({guild.id})")
@@ -96,12 +119,12 @@ class Admin(commands.Cog):
                 "Swing":       cfg["swing_channel_id"],
                 "Liquidation": cfg["liquidation_channel_id"],
             }
-            ch_status = []
-            for name, cid in ch_map.items():
-                if cid and self.bot.get_channel(cid):
-                    ch_status.append(f"✅ {name}")
-                else:
-                    ch_status.append(f"❌ {name} (not configured)")
+            get_channel = self.bot.get_channel
+            channels = {name: cid and get_channel(cid) for name, cid in ch_map.items()}
+            ch_status = [
+                f"✅ {name}" if ch else f"❌ {name} (not configured)"
+                for name, ch in channels.items()
+            ]
             embed.add_field(name="Channel Status", value="\n".join(ch_status), inline=False)
         else:
             embed.add_field(name="⚠️ Not Set Up", value="Run `!setup` to configure this server.", inline=False)
@@ -110,7 +133,7 @@ class Admin(commands.Cog):
 
     @commands.command(name="active")
     async def active_trades(self, ctx):
-        engine = self.bot.cogs.get("SignalEngine")
+        engine = self.engine
         guild_id = ctx.guild.id
         if not engine:
             await ctx.send("❌ Signal engine not loaded.")
@@ -119,14 +142,10 @@ class Admin(commands.Cog):
         if not cfg:
             await ctx.send("⚠️ This server isn't set up yet. Run `!setup` first.")
             return
-        guild_channel_ids = {
-            cfg["scalp_channel_id"],
-            cfg["day_channel_id"],
-            cfg["swing_channel_id"],
-        }
         guild_trades = {
-            sym: t for sym, t in engine.active_trades.items()
-            if t.get("channel_id") in guild_channel_ids
+            sym: engine.active_trades[sym]
+            for sym in engine.trades_by_guild.get(guild_id, ())
+            if sym in engine.active_trades
         }
         if not guild_trades:
             await ctx.send("📭 No active trades for this server.")
@@ -141,7 +160,7 @@ class Admin(commands.Cog):
 
     @commands.command(name="stats")
     async def stats_cmd(self, ctx):
-        engine = self.bot.cogs.get("SignalEngine")
+        engine = self.engine
         if not engine:
             await ctx.send("❌ Signal engine not loaded.")
             return
@@ -163,7 +182,7 @@ class Admin(commands.Cog):
         if trade_type not in ["scalp", "day", "swing"]:
             await ctx.send("❌ Use: `!scan scalp`, `!scan day`, or `!scan swing`")
             return
-        engine = self.bot.cogs.get("SignalEngine")
+        engine = self.engine
         if not engine:
             await ctx.send("❌ Signal engine not loaded.")
             return
@@ -175,7 +194,7 @@ class Admin(commands.Cog):
 
     @commands.command(name="symbols")
     async def symbols_count(self, ctx):
-        engine = self.bot.cogs.get("SignalEngine")
+        engine = self.engine
         count = len(engine._valid_symbols) if engine else 0
         await ctx.send(f"📊 Tracking **{count}** USDT perpetual futures from top {config.TOP_COINS_LIMIT} CMC coins.")
 
@@ -184,6 +203,10 @@ class Admin(commands.Cog):
     async def remove_server(self, ctx):
         """Remove this server's config from the database"""
         db.delete_guild(ctx.guild.id)
+        self.bot.dispatch("guild_configured", ctx.guild.id, 0)
+        engine = self.engine
+        if engine:
+            engine.trades_by_guild.pop(ctx.guild.id, None)
         await ctx.send("🗑️ This server's configuration has been removed. Run `!setup` to reconfigure.")
 
     @commands.command(name="help_bot", aliases=["commands"])
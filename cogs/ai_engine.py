@@ -5,15 +5,17 @@ AI Engine - Claude-powered market analysis and auto-tuning
 - Runs as a background cog
 """
 import asyncio
-import json
 import logging
 import os
+import re
 import time
+from collections import defaultdict
 from datetime import datetime
 from typing import Optional
 
 import aiohttp
 import discord
+import orjson
 from discord.ext import commands, tasks
 
 import config
@@ -27,21 +29,25 @@ CLAUDE_MODEL = "claude-haiku-4-5-20251001"  # Fast + cheap for 24/7 use
 # Auto-tune settings saved here
 TUNE_PATH = "data/auto_tune.json"
 
+# Thresholds Claude may tune, with the (min, max) range suggestions are clamped to
+TUNE_BOUNDS = {
+    "GRADE_A_PLUS":       (70, 92),
+    "GRADE_B_PLUS":       (50, 75),
+    "GRADE_C_PLUS":       (30, 55),
+    "VOLUME_SPIKE_MULT":  (1.2, 4.0),
+    "BTC_OUTPERFORM_PCT": (0.2, 2.0),
+    "MIN_VOLUME_24H_USD": (1_000_000, 50_000_000),
+}
 
-def load_tune() -> dict:
-    if os.path.exists(TUNE_PATH):
-        try:
-            with open(TUNE_PATH) as f:
-                return json.load(f)
-        except Exception:
-            pass
-    return {}
+# Live config namespace — plain dict reads/writes instead of getattr/setattr
+_CFG = vars(config)
 
+# Strips ```json / ``` fences Claude sometimes wraps JSON replies in
+_FENCE_RE = re.compile(r"```(?:json)?")
 
-def save_tune(data: dict):
-    os.makedirs("data", exist_ok=True)
-    with open(TUNE_PATH, "w") as f:
-        json.dump(data, f, indent=2)
+# Max concurrent Discord sends when broadcasting (stays under REST rate limits)
+BROADCAST_CONCURRENCY = 10
+_broadcast_sem = asyncio.Semaphore(BROADCAST_CONCURRENCY)
 
 
 class AIEngine(commands.Cog):
@@ -49,13 +55,20 @@ class AIEngine(commands.Cog):
         self.bot = bot
         self.api_key = os.getenv("ANTHROPIC_API_KEY", "")
         self._session: Optional[aiohttp.ClientSession] = None
-        self._tune_data = load_tune()
+        self._tune_data = self._load_tune()  # in-memory snapshot; file is only read here
         self._last_tune = self._tune_data.get("last_tuned", 0)
+        # Serializes the scheduled loop and !tune so one Claude call runs at a time
+        self._tune_lock = asyncio.Lock()
+        # Strong refs to fire-and-forget tasks — the loop only keeps weak ones
+        self._bg_tasks: set = set()
+        # guild_id -> log channel, built lazily; kept fresh by the listeners below
+        self._log_channels: Optional[dict] = None
         # Apply any saved tuned thresholds on startup
         self._apply_tuned_thresholds()
 
     async def cog_load(self):
-        self._session = aiohttp.ClientSession()
+        os.makedirs(os.path.dirname(TUNE_PATH), exist_ok=True)
+        self._session = self.bot.http_session  # shared keep-alive session (bot.py)
         if not self.api_key:
             logger.warning("ANTHROPIC_API_KEY not set — AI analysis disabled")
         else:
@@ -64,8 +77,43 @@ class AIEngine(commands.Cog):
 
     async def cog_unload(self):
         self.auto_tune_loop.cancel()
-        if self._session:
-            await self._session.close()
+        for task in self._bg_tasks:
+            task.cancel()
+
+    def _spawn(self, coro):
+        """Run coro in the background, keeping it alive and logging any failure"""
+        task = asyncio.create_task(coro)
+        self._bg_tasks.add(task)
+        task.add_done_callback(self._bg_task_done)
+        return task
+
+    def _bg_task_done(self, task: asyncio.Task):
+        self._bg_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Background task failed: {task.exception()!r}")
+
+    # ─── Tune Persistence ────────────────────────────────────────────────────
+
+    @staticmethod
+    def _load_tune() -> dict:
+        if os.path.exists(TUNE_PATH):
+            try:
+                with open(TUNE_PATH, "rb") as f:
+                    return orjson.loads(f.read())
+            except Exception:
+                pass
+        return {}
+
+    @staticmethod
+    def _write_tune_atomic(data: dict):
+        """Write to a temp file then rename, so a crash never leaves a half-written file"""
+        tmp = TUNE_PATH + ".tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+            os.replace(tmp, TUNE_PATH)
+        except Exception as e:
+            logger.error(f"Failed to save auto-tune data: {e}")
 
     # ─── Claude API Call ─────────────────────────────────────────────────────
 
@@ -108,6 +156,10 @@ class AIEngine(commands.Cog):
         if not self.api_key:
             return None
 
+        get = indicators.get
+        e9, e21, e50 = get('ema9', 0), get('ema21', 0), get('ema50', 0)
+        ema_stack = 'Bullish' if e9 > e21 > e50 else 'Bearish' if e9 < e21 < e50 else 'Mixed'
+
         system = (
             "You are a professional crypto futures trader. "
             "Given a trading signal with technical indicators, write a concise 2-3 sentence market analysis. "
@@ -127,17 +179,17 @@ Take Profits: {signal.get('tps')}
 Confluences: {', '.join(signal.get('confluences', []))}
 
 Key Indicators:
-RSI(14): {indicators.get('rsi14', 'N/A')}
-MACD Hist: {indicators.get('macd_hist', 'N/A')}
-EMA Stack: {'Bullish' if indicators.get('ema9', 0) > indicators.get('ema21', 0) > indicators.get('ema50', 0) else 'Bearish' if indicators.get('ema9', 0) < indicators.get('ema21', 0) < indicators.get('ema50', 0) else 'Mixed'}
-Volume Spike: {indicators.get('vol_ratio', 'N/A')}x avg
+RSI(14): {get('rsi14', 'N/A')}
+MACD Hist: {get('macd_hist', 'N/A')}
+EMA Stack: {ema_stack}
+Volume Spike: {get('vol_ratio', 'N/A')}x avg
 Funding Rate: {signal.get('funding_rate', 'N/A')}
 OB Imbalance: {signal.get('ob_imbalance', 'N/A')}
-Patterns: {', '.join(indicators.get('patterns', [])) or 'None'}
+Patterns: {', '.join(get('patterns', [])) or 'None'}
 
 Write the market analysis:"""
 
-        analysis = await self._call_claude(system, user, max_tokens=200)
+        analysis = await self._call_claude(system, user, max_tokens=150)
         return analysis
 
     # ─── Auto-Tune Loop ──────────────────────────────────────────────────────
@@ -155,7 +207,17 @@ Write the market analysis:"""
         await self.bot.wait_until_ready()
         await asyncio.sleep(60)  # Wait 1 min after startup before first tune
 
-    async def _run_auto_tune(self):
+    async def _run_auto_tune(self) -> bool:
+        """Run one tune cycle; returns False if another cycle already held the lock"""
+        # A cycle already in flight covers this one — don't spend a second Claude call
+        if self._tune_lock.locked():
+            logger.info("Auto-tune: cycle already running, skipping")
+            return False
+        async with self._tune_lock:
+            await self._auto_tune_cycle()
+        return True
+
+    async def _auto_tune_cycle(self):
         if not self.api_key:
             return
 
@@ -171,46 +233,33 @@ Write the market analysis:"""
 
         logger.info(f"Auto-tune: analyzing {len(history)} trades with Claude...")
 
-        # Build stats breakdown
-        by_type  = {}
-        by_grade = {}
-        by_dir   = {}
+        # Build stats breakdown in one pass — each bucket is a [wins, total] pair
+        by_type    = defaultdict(lambda: [0, 0])
+        by_grade   = defaultdict(lambda: [0, 0])
+        by_dir     = defaultdict(lambda: [0, 0])
+        total_wins = 0
         for t in history:
-            tt = t.get("trade_type", "scalp")
-            g  = t.get("grade", "?")
-            d  = t.get("direction", "LONG")
-            o  = t.get("outcome", 0)
-
-            by_type.setdefault(tt,   {"wins": 0, "total": 0})
-            by_grade.setdefault(g,   {"wins": 0, "total": 0})
-            by_dir.setdefault(d,     {"wins": 0, "total": 0})
+            win = 1 if t.get("outcome", 0) == 1 else 0
+            for a in (by_type[t.get("trade_type", "scalp")],
+                      by_grade[t.get("grade", "?")],
+                      by_dir[t.get("direction", "LONG")]):
+                a[0] += win
+                a[1] += 1
+            total_wins += win
 
-            by_type[tt]["total"]   += 1
-            by_grade[g]["total"]   += 1
-            by_dir[d]["total"]     += 1
-            if o == 1:
-                by_type[tt]["wins"]  += 1
-                by_grade[g]["wins"]  += 1
-                by_dir[d]["wins"]    += 1
+        def pct(wins, total): return round(wins/total*100, 1) if total else 0
 
-        def pct(d): return round(d["wins"]/d["total"]*100, 1) if d["total"] else 0
+        def summarize(acc): return {k: {"win_rate": pct(w, n), "total": n} for k, (w, n) in acc.items()}
 
         stats_summary = {
             "total_trades": len(history),
-            "overall_win_rate": pct({"wins": sum(1 for t in history if t.get("outcome")==1), "total": len(history)}),
-            "by_trade_type": {k: {"win_rate": pct(v), "total": v["total"]} for k, v in by_type.items()},
-            "by_grade":      {k: {"win_rate": pct(v), "total": v["total"]} for k, v in by_grade.items()},
-            "by_direction":  {k: {"win_rate": pct(v), "total": v["total"]} for k, v in by_dir.items()},
+            "overall_win_rate": pct(total_wins, len(history)),
+            "by_trade_type": summarize(by_type),
+            "by_grade":      summarize(by_grade),
+            "by_direction":  summarize(by_dir),
         }
 
-        current_config = {
-            "GRADE_A_PLUS":      config.GRADE_A_PLUS,
-            "GRADE_B_PLUS":      config.GRADE_B_PLUS,
-            "GRADE_C_PLUS":      config.GRADE_C_PLUS,
-            "VOLUME_SPIKE_MULT": config.VOLUME_SPIKE_MULT,
-            "BTC_OUTPERFORM_PCT": config.BTC_OUTPERFORM_PCT,
-            "MIN_VOLUME_24H_USD": config.MIN_VOLUME_24H_USD,
-        }
+        current_config = {attr: _CFG[attr] for attr in TUNE_BOUNDS}
 
         system = (
             "You are an expert quant trader and algorithmic trading system optimizer. "
@@ -220,10 +269,10 @@ Write the market analysis:"""
         )
 
         user = f"""Performance Stats:
-{json.dumps(stats_summary, indent=2)}
+{orjson.dumps(stats_summary).decode()}
 
 Current Config Thresholds:
-{json.dumps(current_config, indent=2)}
+{orjson.dumps(current_config).decode()}
 
 Rules for optimization:
 - If a grade's win rate is below 45%, raise its score threshold by 3-8 points
@@ -235,42 +284,36 @@ Rules for optimization:
 - BTC_OUTPERFORM_PCT range: 0.2 to 2.0
 - Keep changes conservative (max 10% change per tune cycle)
 
-Respond with ONLY a JSON object with the optimized values, example format:
-{{"GRADE_A_PLUS": 82, "GRADE_B_PLUS": 63, "GRADE_C_PLUS": 42, "VOLUME_SPIKE_MULT": 2.2, "BTC_OUTPERFORM_PCT": 0.5, "MIN_VOLUME_24H_USD": 5000000}}"""
+Respond with ONLY a flat JSON object of optimized values, using the same keys as Current Config Thresholds."""
 
-        response = await self._call_claude(system, user, max_tokens=300)
+        # Reply is a 6-key JSON object (~60 tokens) — cap output accordingly
+        response = await self._call_claude(system, user, max_tokens=150)
         if not response:
             return
 
         try:
             # Strip markdown code fences properly using regex (str.strip("```json")
             # strips individual characters, NOT the substring — use re.sub instead)
-            import re as _re
-            clean = _re.sub(r"```(?:json)?", "", response.strip()).strip()
-            new_vals = json.loads(clean)
-            self._apply_new_thresholds(new_vals, stats_summary)
-        except json.JSONDecodeError as e:
+            # Fast path: bare JSON (the usual Haiku reply) skips the regex scan
+            raw = response.strip()
+            clean = raw if raw[:1] == "{" and raw[-1:] == "}" else _FENCE_RE.sub("", raw).strip()
+            new_vals = orjson.loads(clean)
+            await self._apply_new_thresholds(new_vals, stats_summary)
+        except orjson.JSONDecodeError as e:
             logger.error(f"Auto-tune: failed to parse Claude response: {e}\nResponse: {response[:300]}")
 
-    def _apply_new_thresholds(self, new_vals: dict, stats: dict):
+    async def _apply_new_thresholds(self, new_vals: dict, stats: dict):
         """Apply Claude-suggested thresholds to live config"""
         changes = []
 
-        def safe_set(attr, key, min_val, max_val):
-            if key in new_vals:
-                old = getattr(config, attr)
-                new = max(min_val, min(max_val, new_vals[key]))
+        for attr, (min_val, max_val) in TUNE_BOUNDS.items():
+            if attr in new_vals:
+                old = _CFG[attr]
+                new = max(min_val, min(max_val, new_vals[attr]))
                 if abs(new - old) > 0.01:
-                    setattr(config, attr, new)
+                    _CFG[attr] = new
                     changes.append(f"{attr}: {old} → {new}")
 
-        safe_set("GRADE_A_PLUS",       "GRADE_A_PLUS",       70, 92)
-        safe_set("GRADE_B_PLUS",       "GRADE_B_PLUS",       50, 75)
-        safe_set("GRADE_C_PLUS",       "GRADE_C_PLUS",       30, 55)
-        safe_set("VOLUME_SPIKE_MULT",  "VOLUME_SPIKE_MULT",  1.2, 4.0)
-        safe_set("BTC_OUTPERFORM_PCT", "BTC_OUTPERFORM_PCT", 0.2, 2.0)
-        safe_set("MIN_VOLUME_24H_USD", "MIN_VOLUME_24H_USD", 1_000_000, 50_000_000)
-
         if changes:
             logger.info(f"Auto-tune applied {len(changes)} changes: {', '.join(changes)}")
             # Save for persistence across restarts
@@ -279,18 +322,13 @@ Respond with ONLY a JSON object with the optimized values, example format:
                 "last_tuned_str": datetime.utcnow().isoformat(),
                 "changes": changes,
                 "stats_at_tune": stats,
-                "current_thresholds": {
-                    "GRADE_A_PLUS":       config.GRADE_A_PLUS,
-                    "GRADE_B_PLUS":       config.GRADE_B_PLUS,
-                    "GRADE_C_PLUS":       config.GRADE_C_PLUS,
-                    "VOLUME_SPIKE_MULT":  config.VOLUME_SPIKE_MULT,
-                    "BTC_OUTPERFORM_PCT": config.BTC_OUTPERFORM_PCT,
-                    "MIN_VOLUME_24H_USD": config.MIN_VOLUME_24H_USD,
-                }
+                "current_thresholds": {attr: _CFG[attr] for attr in TUNE_BOUNDS},
             }
-            save_tune(self._tune_data)
+            # Disk write off the event loop, awaited while the caller still holds _tune_lock
+            # so two cycles can never race on the temp file
+            await asyncio.to_thread(self._write_tune_atomic, self._tune_data)
             # Notify all log channels
-            asyncio.create_task(self._broadcast_tune_update(changes, stats))
+            self._spawn(self._broadcast_tune_update(changes, stats))
         else:
             logger.info("Auto-tune: thresholds already optimal, no changes needed")
 
@@ -300,15 +338,14 @@ Respond with ONLY a JSON object with the optimized values, example format:
         if not saved:
             return
         for attr, val in saved.items():
-            if hasattr(config, attr):
-                setattr(config, attr, val)
+            if attr in _CFG:
+                _CFG[attr] = val
         if saved:
             logger.info(f"Restored {len(saved)} auto-tuned thresholds from last session")
 
     async def _broadcast_tune_update(self, changes: list, stats: dict):
         """Send auto-tune report to all guild log channels"""
         await asyncio.sleep(2)
-        guilds = db.get_all_guilds()
         embed = discord.Embed(
             title="🤖 AI Auto-Tune Complete",
             description=f"Claude analyzed **{stats.get('total_trades', 0)} trades** and optimized signal thresholds.",
@@ -327,16 +364,47 @@ Respond with ONLY a JSON object with the optimized values, example format:
         )
         embed.set_footer(text="Thresholds auto-saved • Next tune in 6 hours")
 
-        for g in guilds:
-            log_ch_id = g["log_channel_id"]
-            if not log_ch_id:
-                continue
-            ch = self.bot.get_channel(log_ch_id)
-            if ch:
+        async def _send(ch, guild_id):
+            async with _broadcast_sem:
                 try:
                     await ch.send(embed=embed)
                 except Exception as e:
-                    logger.error(f"Failed to send tune report to guild {g['guild_id']}: {e}")
+                    logger.error(f"Failed to send tune report to guild {guild_id}: {e}")
+
+        # Fan out concurrently — one REST round trip of wall-clock, not one per guild
+        sends = [
+            asyncio.create_task(_send(ch, guild_id))
+            for guild_id, ch in self._get_log_channels().items()
+        ]
+        await asyncio.gather(*sends, return_exceptions=True)
+
+    def _get_log_channels(self) -> dict:
+        """Resolve every guild's log channel once, then serve from memory"""
+        if self._log_channels is None:
+            channels = {}
+            for g in db.get_all_guilds():
+                log_ch_id = g["log_channel_id"]
+                ch = self.bot.get_channel(log_ch_id) if log_ch_id else None
+                if ch:
+                    channels[g["guild_id"]] = ch
+            self._log_channels = channels
+        return self._log_channels
+
+    @commands.Cog.listener()
+    async def on_guild_configured(self, guild_id: int, log_channel_id: int):
+        """Dispatched by Admin after !setup / !removeserver (log_channel_id=0)"""
+        if self._log_channels is None:
+            return
+        ch = self.bot.get_channel(log_channel_id) if log_channel_id else None
+        if ch:
+            self._log_channels[guild_id] = ch
+        else:
+            self._log_channels.pop(guild_id, None)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+        if self._log_channels is not None:
+            self._log_channels.pop(guild.id, None)
 
     # ─── Admin Commands ──────────────────────────────────────────────────────
 
@@ -347,8 +415,14 @@ Respond with ONLY a JSON object with the optimized values, example format:
         if not self.api_key:
             await ctx.send("❌ `ANTHROPIC_API_KEY` not set in `.env` — AI features disabled.")
             return
+        if self._tune_lock.locked():
+            await ctx.send("⏳ Auto-tune already running — wait for it to finish.")
+            return
         msg = await ctx.send("🤖 Running AI auto-tune analysis with Claude...")
-        await self._run_auto_tune()
+        # The check above can race another !tune across the send — trust the lock's answer
+        if not await self._run_auto_tune():
+            await msg.edit(content="⏳ Auto-tune already running — wait for it to finish.")
+            return
         if self._tune_data.get("changes"):
             changes = self._tune_data["changes"]
             await msg.edit(content=f"✅ Auto-tune complete! Applied **{len(changes)}** threshold changes. Check your log channel.")
@@ -35,6 +35,27 @@ CLAUDE_CONSULT_MAX = 0.65
 GRADE_PRIORITY = {"A+": 3, "B+": 2, "C+": 1}
 
 
+def fit_ensemble(features: list, outcomes: list):
+    """
+    Fit scaler + GB/RF soft-voting ensemble.
+    Module-level and plain-data in/out so it can run in a worker process.
+    Returns (ensemble, scaler, cv_mean, cv_std).
+    """
+    X = np.array(features)
+    y = np.array(outcomes)
+
+    scaler   = StandardScaler()
+    X_scaled = scaler.fit_transform(X)
+
+    gb = GradientBoostingClassifier(n_estimators=100, learning_rate=0.1, max_depth=4, random_state=42)
+    rf = RandomForestClassifier(n_estimators=100, max_depth=6, random_state=42)
+    ensemble = VotingClassifier(estimators=[("gb", gb), ("rf", rf)], voting="soft")
+    ensemble.fit(X_scaled, y)
+
+    cv_scores = cross_val_score(ensemble, X_scaled, y, cv=min(5, len(y) // 10 + 1))
+    return ensemble, scaler, float(cv_scores.mean()), float(cv_scores.std())
+
+
 class MLEngine:
     def __init__(self, model_path: str = "data/ml_model.pkl",
                  history_path: str = "data/trade_history.json"):
@@ -262,31 +283,47 @@ Probability TP1 will be hit (0.0-1.0):"""
         self._save_history()
         logger.info(f"Recorded trade: {signal.get('symbol')} -> {outcome}")
 
-    def retrain(self, min_samples: int = 50) -> bool:
+    def _training_set(self, min_samples: int):
+        """(features, outcomes) lists for a retrain, or None if there isn't enough data"""
         if not ML_AVAILABLE:
-            return False
+            return None
         if len(self.trade_history) < min_samples:
             logger.info(f"Not enough data to retrain ({len(self.trade_history)}/{min_samples})")
+            return None
+        return [t["features"] for t in self.trade_history], [t["outcome"] for t in self.trade_history]
+
+    def _install_model(self, fitted) -> bool:
+        ensemble, scaler, cv_mean, cv_std = fitted
+        logger.info(f"ML retrain complete. CV accuracy: {cv_mean:.3f} ± {cv_std:.3f}")
+        self.model  = ensemble
+        self.scaler = scaler
+        self.last_trained = time.time()
+        self._save_model()
+        return True
+
+    def retrain(self, min_samples: int = 50) -> bool:
+        data = self._training_set(min_samples)
+        if data is None:
             return False
         try:
-            X = np.array([t["features"] for t in self.trade_history])
-            y = np.array([t["outcome"] for t in self.trade_history])
-
-            self.scaler = StandardScaler()
-            X_scaled = self.scaler.fit_transform(X)
-
-            gb = GradientBoostingClassifier(n_estimators=100, learning_rate=0.1, max_depth=4, random_state=42)
-            rf = RandomForestClassifier(n_estimators=100, max_depth=6, random_state=42)
-            ensemble = VotingClassifier(estimators=[("gb", gb), ("rf", rf)], voting="soft")
-            ensemble.fit(X_scaled, y)
-
-            cv_scores = cross_val_score(ensemble, X_scaled, y, cv=min(5, len(y) // 10 + 1))
-            logger.info(f"ML retrain complete. CV accuracy: {cv_scores.mean():.3f} ± {cv_scores.std():.3f}")
+            return self._install_model(fit_ensemble(*data))
+        except Exception as e:
+            logger.error(f"ML retrain error: {e}")
+            return False
 
-            self.model = ensemble
-            self.last_trained = time.time()
-            self._save_model()
-            return True
+    async def retrain_async(self, min_samples: int = 50, run_fit=None) -> bool:
+        """
+        Retrain with the CPU-heavy fit awaited through `run_fit(fn, *args)` — pass
+        SignalEngine.run_cpu to keep it off the bot's GIL in a self-healing process
+        pool; defaults to a worker thread. The training set is snapshotted before
+        the first await.
+        """
+        data = self._training_set(min_samples)
+        if data is None:
+            return False
+        try:
+            fitted = await (run_fit or asyncio.to_thread)(fit_ensemble, *data)
+            return await asyncio.to_thread(self._install_model, fitted)
         except Exception as e:
             logger.error(f"ML retrain error: {e}")
             return False
@@ -393,7 +393,7 @@ Be direct and specific with numbers."""
         original_history = ml.trade_history
         ml.trade_history = all_data
 
-        result = await asyncio.to_thread(ml.retrain, 30)
+        result = await ml.retrain_async(30, engine.run_cpu)
 
         # Restore only real trades in ml.trade_history
         ml.trade_history = original_history
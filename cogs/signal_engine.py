@@ -3,14 +3,24 @@ Signal Engine Cog
 Main trading signal scanner and broadcaster
 """
 import asyncio
+import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
+import datetime
 import logging
+import multiprocessing
+import os
 import time
+from collections import OrderedDict, defaultdict
 from typing import Optional
 
+import aiohttp
 import discord
+import numpy as np
+import orjson
 from discord.ext import commands, tasks
 
 import config
+import db
 from utils.data_fetcher import DataFetcher
 from utils.indicators import calculate_all_indicators
 from utils.signal_scorer import SignalScorer
@@ -18,19 +28,287 @@ from cogs.ml_engine import MLEngine
 
 logger = logging.getLogger("SignalEngine")
 
+# Cap on concurrent Binance ticker requests while monitoring open trades
+TICKER_CONCURRENCY = 8
+_ticker_sem = asyncio.Semaphore(TICKER_CONCURRENCY)
+
+# Cap on symbols analysed at once during a scan (each one makes up to 6 Binance calls)
+SCAN_CONCURRENCY = 16
+# Worker processes for calculate_all_indicators — each one holds its own pandas/NumPy import
+INDICATOR_WORKERS = min(4, os.cpu_count() or 1)
+# Workers start clean: fork would copy locks held by the logging/aiohttp/sqlite threads,
+# so POSIX uses forkserver; elsewhere spawn is the only safe option
+POOL_MP_CONTEXT = multiprocessing.get_context("forkserver" if os.name == "posix" else "spawn")
+_scan_sem = asyncio.Semaphore(SCAN_CONCURRENCY)
+
+# "Never happened" start value for monotonic timers — monotonic() can be < any interval after boot
+NEVER = float("-inf")
+
+# Dominance endpoints
+CG_GLOBAL_URL  = "https://api.coingecko.com/api/v3/global"
+CMC_GLOBAL_URL = "https://pro-api.coinmarketcap.com/v1/global-metrics/quotes/latest"
+
+CMC_LISTINGS_TTL = 300   # seconds to reuse the CMC top-20 listings market caps
+DOM_LOG_INTERVAL = 1800  # seconds between INFO dominance summaries
+
+# DOM candle trend direction — ints so the decision tree compares ints, not strings
+TREND_FALLING, TREND_FLAT, TREND_RISING = -1, 0, 1
+TREND_LABELS = {TREND_FALLING: "falling", TREND_FLAT: "flat", TREND_RISING: "rising"}
+
+# _update_dom_signal reason templates, keyed by decision-tree branch
+SCALP_REASONS = {
+    "panic":         "⛔ PANIC — USDT.D accelerating +{usdt_vel_pct:.3f}%/min "
+                     "(accel={usdt_accel:+.4f}) @ {usdt:.3f}%",
+    "fear_building": "🔴 USDT.D rising {usdt_vel:+.4f}%/min → fear building "
+                     "@ {usdt:.3f}% — SHORT bias",
+    "fear_easing":   "🟠 USDT.D falling from high ({usdt:.3f}%) — still elevated, cautious",
+    "long_ok":       "🟢 USDT.D falling {usdt_vel:+.4f}%/min + BTC.D {btc_trend} "
+                     "@ {usdt:.3f}% — LONG bias",
+    "alts_weak":     "🟡 USDT.D falling but BTC.D rising {btc_vel:+.4f}%/min "
+                     "— BTC/ETH longs ok, alts risky",
+    "btc_surge":     "🟡 BTC.D surging +{btc_vel:.4f}%/min (accel={btc_accel:+.4f}) "
+                     "— alts losing value, SHORT alts",
+    "neutral":       "⚪ No clear candle signal — USDT.D {usdt_trend} "
+                     "@ {usdt:.3f}%, BTC.D {btc_trend} @ {btc:.3f}%",
+}
+
+# ── Regime table ─────────────────────────────────────────────────────────────
+# USDT.D buckets — real-world calibration (Feb 2026 TradingView data):
+#   8.29% = active fear / risk-off (confirmed from chart)
+#   7.9%  = transition zone, caution
+#   Below 6.5% = risk-on / greed
+#   Below 5.5% = full altseason greed
+USDT_EXTREME_FEAR, USDT_FEAR, USDT_NEUTRAL, USDT_GREED, USDT_ALT_GREED = range(5)
+# BTC.D buckets — above 58% = BTC dominance phase, below 48% = altseason territory
+BTC_LOW, BTC_MID, BTC_HIGH = range(3)
+
+
+def usdt_bucket(usdt_d: float) -> int:
+    if usdt_d > 8.0:  return USDT_EXTREME_FEAR   # high fear — only shorts
+    if usdt_d > 7.5:  return USDT_FEAR           # moderate fear — caution on longs
+    if usdt_d <= 5.5: return USDT_ALT_GREED      # full altseason
+    if usdt_d < 6.5:  return USDT_GREED
+    return USDT_NEUTRAL                          # 6.5 – 7.5
+
+
+def btc_bucket(btc_d: float) -> int:
+    if btc_d > 58.0: return BTC_HIGH
+    if btc_d < 48.0: return BTC_LOW
+    return BTC_MID
+
+
+# (usdt_bucket, btc_bucket) -> (regime, allow_long, allow_short, bias template)
+_RISK_OFF    = ("risk_off", False, True,
+                "🔴 RISK-OFF — USDT.D {usdt_d:.2f}% (extreme fear), avoid longs")
+_CAUTION     = ("risk_off", False, True,
+                "🟠 CAUTION — USDT.D {usdt_d:.2f}% (fear elevated), shorts preferred")
+_ALTSEASON   = ("risk_on_alt", True, False,
+                "🟢 ALTSEASON — USDT.D {usdt_d:.2f}% low + BTC.D {btc_d:.1f}% falling")
+_BTC_SEASON  = ("risk_on_btc", True, True,
+                "🟡 BTC SEASON — USDT.D {usdt_d:.2f}%, BTC.D {btc_d:.1f}% dominant")
+_NEUTRAL_MIX = ("neutral", True, True, "⚪ NEUTRAL — USDT.D {usdt_d:.2f}%, mixed signals")
+_NEUTRAL     = ("neutral", True, True, "⚪ NEUTRAL — USDT.D {usdt_d:.2f}%, BTC.D {btc_d:.1f}%")
+
+REGIME_TABLE = {}
+for _b in (BTC_LOW, BTC_MID, BTC_HIGH):
+    REGIME_TABLE[USDT_EXTREME_FEAR, _b] = _RISK_OFF
+    REGIME_TABLE[USDT_FEAR, _b]         = _CAUTION
+    REGIME_TABLE[USDT_NEUTRAL, _b]      = _NEUTRAL_MIX
+    REGIME_TABLE[USDT_GREED, _b]        = _BTC_SEASON if _b == BTC_HIGH else _NEUTRAL_MIX
+REGIME_TABLE[USDT_ALT_GREED, BTC_LOW]  = _ALTSEASON
+REGIME_TABLE[USDT_ALT_GREED, BTC_MID]  = _NEUTRAL
+REGIME_TABLE[USDT_ALT_GREED, BTC_HIGH] = _BTC_SEASON
+del _b
+
+# Per-scan regime flags, packed once so the Phase 1 filters test bits instead of dict strings
+ALLOW_LONG, ALLOW_SHORT, BTC_SEASON, ALTSEASON, BTC_ONLY_CANDLE = 1, 2, 4, 8, 16
+
+
+def regime_flags(dom: dict, dom_sig: dict, trade_type: str) -> int:
+    flags = 0
+    if dom["allow_long"]:  flags |= ALLOW_LONG
+    if dom["allow_short"]: flags |= ALLOW_SHORT
+    if dom["regime"] == "risk_on_btc": flags |= BTC_SEASON
+    if dom["regime"] == "risk_on_alt": flags |= ALTSEASON
+    if trade_type == "scalp" and dom_sig.get("scalp_bias") == "btc_long_only":
+        flags |= BTC_ONLY_CANDLE
+    return flags
+
+
+# Dominance shift alert styling per regime
+REGIME_COLORS = {
+    "risk_on_alt": 0x00C853,
+    "risk_on_btc": 0xFFD600,
+    "risk_off":    0xFF1744,
+    "neutral":     0x607D8B,
+}
+REGIME_ADVICE = {
+    "risk_on_alt": "💡 Altseason: Focus on alt LONG setups. Avoid shorts.",
+    "risk_on_btc": "💡 BTC season: Prefer BTC/ETH longs. Alt longs risky.",
+    "risk_off":    "⚠️ Fear regime: Only SHORT setups. Avoid longs.",
+    "neutral":     "💡 Mixed signals: Trade both directions with caution.",
+}
+
+CORR_CACHE_SIZE = 1024  # (symbol, interval) pairs kept in the BTC correlation LRU
+
+# Candle length per scan interval — BTC returns are reused until the next candle closes
+INTERVAL_SECS = {"5m": 300, "1h": 3600, "4h": 14400}
+
+# Confluences left out of the embed list — warnings, and Wyckoff/PA which get their own field
+CONF_SKIP_PREFIXES = ("⚠️", "✅ Wyckoff", "✅ PA:")
+
+# Signal send pacing — Discord allows ~5 messages per 5s per channel
+SEND_RATE = 5
+SEND_PER  = 5.0
+
+GRADES = ("A+", "B+", "C+")
+
+# Symbols exempt from the BTC-season alt-long demotion
+MAJORS = frozenset({"BTCUSDT", "ETHUSDT"})
+
+# Signal embed text
+CHANNEL_KEYS = {"scalp": "scalp_channel_id", "day": "day_channel_id", "swing": "swing_channel_id"}
+GRADE_EMOJI  = {"A+": "🏆", "B+": "🥈", "C+": "🥉"}
+GRADE_DESC   = {
+    "A+": "🎯 Sniper shot — take it without hesitation",
+    "B+": "✅ Good setup — most criteria met",
+    "C+": "⚠️ Directional bias — partial setup",
+}
+WYCKOFF_LABELS = {
+    "accumulation_spring": "📦 Wyckoff: Accumulation Spring",
+    "markup_SOS":          "📈 Wyckoff: Markup — Sign of Strength",
+    "distribution_UTAD":   "📤 Wyckoff: Distribution UTAD",
+    "markdown_SOW":        "📉 Wyckoff: Markdown — Sign of Weakness",
+}
+SCALP_BIAS_ICONS = {
+    "long_ok":      "🟢",
+    "short_ok":     "🔴",
+    "btc_long_only":"🟡",
+    "neutral":      "⚪",
+    "blocked":      "⛔",
+}
+
+# Minimum seconds between sends, per trade type per grade
+QUOTA_GAP = {
+    "scalp": {"A+":     0, "B+": 55*60, "C+": 55*60},
+    "day":   {"A+": 60*60, "B+": 90*60, "C+": 90*60},
+    "swing": {"A+": 90*60, "B+":120*60, "C+":120*60},
+}
+
+# utcnow().replace() kwargs for the start of the UTC day
+MIDNIGHT = dict(hour=0, minute=0, second=0, microsecond=0)
+
+
+class DomCandleRing:
+    """
+    Fixed-size ring buffer of 1-min dominance candles, stored column-wise
+    (one NumPy array per field) instead of one dict per candle.
+    """
+    __slots__ = ("size", "t", "btc_d", "usdt_d", "head", "count")
+
+    def __init__(self, size: int = 60):
+        self.size   = size
+        self.t      = np.zeros(size, dtype=np.int64)   # epoch ns
+        self.btc_d  = np.zeros(size, dtype=np.float64)
+        self.usdt_d = np.zeros(size, dtype=np.float64)
+        self.head   = 0   # next slot to write
+        self.count  = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def append(self, t: int, btc_d: float, usdt_d: float):
+        i = self.head
+        self.t[i], self.btc_d[i], self.usdt_d[i] = t, btc_d, usdt_d
+        self.head  = (i + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+
+    def back(self, k: int) -> tuple:
+        """(t, btc_d, usdt_d) of the k-th newest candle (k=1 is the latest)"""
+        i = (self.head - k) % self.size
+        return int(self.t[i]), float(self.btc_d[i]), float(self.usdt_d[i])
+
+
+def _fresh_quota(daily_target: int) -> dict:
+    """Per-trade-type quota state, as it stands before the first send"""
+    return {
+        "day_start":      0.0,                     # timestamp of last daily reset
+        "sent_today":     dict.fromkeys(GRADES, 0),
+        "total_sent":     0,                       # running sum of sent_today
+        "last_hour_sent": NEVER,                   # monotonic time of last signal sent
+        "hour_has_aplus": False,                   # did we find an A+ this hour?
+        "day_has_bplus":  False,                   # did we find a B+ today?
+        "daily_target":   daily_target,
+    }
+
+
+class TokenBucket:
+    """Async token bucket: bursts of up to `rate` acquisitions, refilled at `rate` per `per` seconds"""
+    __slots__ = ("rate", "per", "tokens", "updated", "_lock")
+
+    def __init__(self, rate: int, per: float):
+        self.rate    = rate
+        self.per     = per
+        self.tokens  = float(rate)
+        self.updated = time.monotonic()
+        self._lock   = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens  = min(self.rate, self.tokens + (now - self.updated) * self.rate / self.per)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) * self.per / self.rate)
+
+
+def make_process_pool(workers: int) -> concurrent.futures.ProcessPoolExecutor:
+    return concurrent.futures.ProcessPoolExecutor(max_workers=workers, mp_context=POOL_MP_CONTEXT)
+
+
+def fmt_price(p: float) -> str:
+    """Price with precision scaled to its magnitude, '—' for 0/None"""
+    if not p: return "—"
+    if p >= 1000:  return f"{p:,.2f}"
+    if p >= 1:     return f"{p:.4f}"
+    if p >= 0.01:  return f"{p:.5f}"
+    return f"{p:.8f}"
+
 
 class SignalEngine(commands.Cog):
     def __init__(self, bot):
         self.bot     = bot
-        self.fetcher = DataFetcher(config.CMC_API_KEY, config.BINANCE_API_KEY, config.BINANCE_SECRET)
+        self.fetcher = DataFetcher(config.CMC_API_KEY, config.BINANCE_API_KEY, config.BINANCE_SECRET,
+                                   session=bot.http_session)
         self.scorer  = SignalScorer()
         self.ml      = MLEngine(config.ML_MODEL_PATH, config.TRADE_HISTORY_PATH)
-
-        # Dominance cache: (btc_d, usdt_d, timestamp)
+        # Model fits run in a worker process so they never hold the bot's GIL
+        self.cpu_pool = make_process_pool(1)
+        # Per-symbol indicator math is spread over its own pool so a long fit can't stall scans
+        self.indicator_pool = make_process_pool(INDICATOR_WORKERS)
+        self._pool_workers = {"cpu_pool": 1, "indicator_pool": INDICATOR_WORKERS}
+        # Shared keep-alive session for the CoinGecko/CMC dominance calls (set in cog_load)
+        self._http = None
+
+        # Dominance cache: (btc_d, usdt_d, monotonic ts)
         self._dominance_cache = (0.0, 0.0, 0.0)
-
-        # BTC correlation cache: {symbol: (corr, timestamp)} refreshed every 30min per symbol
-        self._btc_corr_cache: dict = {}  # {symbol: (float, float)} = (corr, ts)
+        self._last_dom_log_ts = NEVER
+        self._last_good_dom = (0.0, 0.0)   # last validated (btc_d, usdt_d) from any source
+        self._cmc_listings: Optional[tuple] = None  # ((total, usdt, btc) mcaps, monotonic ts)
+        # CoinGecko /global validator + the (btc_d, usdt_d) it was parsed into
+        self._cg_etag: Optional[str] = None
+        self._cg_last = (0.0, 0.0)
+
+        # BTC correlation cache: {(symbol, interval): (corr, timestamp)} refreshed every 30min
+        # LRU-bounded so delisted/rotated-out symbols don't accumulate forever
+        self._btc_corr_cache: OrderedDict = OrderedDict()  # {(symbol, interval): (corr, ts)}
+        # BTC returns shared by every correlation: {interval: (candle_bucket, close, centred_ret, norm)}
+        self._btc_ret_cache: dict = {}
+        # One BTC klines fetch per interval even when a concurrent scan misses all at once
+        self._btc_ret_locks: defaultdict = defaultdict(asyncio.Lock)
 
         # BTC price history for live dominance tracking (last 60 values, 1min each)
         self._btc_price_history: list = []
@@ -41,14 +319,15 @@ class SignalEngine(commands.Cog):
 
         # ── Candle-by-candle dominance state for scalp filtering ─────────────
         # Stores last N candles of USDT.D and BTC.D (1-min resolution from CoinGecko)
-        # Shape: [{"t": timestamp, "btc_d": float, "usdt_d": float}, ...]
-        self._dom_candles: list = []          # rolling 60-candle history
-        self._dom_candle_ts: float = 0.0      # last candle fetch timestamp
+        # Ring buffer of (t epoch_ns, btc_d, usdt_d) — rolling 60-candle history
+        self._dom_candles = DomCandleRing(60)
+        self._dom_candle_ts: float = NEVER    # last candle fetch (monotonic)
+        self._dom_signal_key: int = 0         # newest candle "t" _dom_signal was built from
 
         # Derived signals updated every candle:
         self._dom_signal = {
-            "usdt_trend":    "flat",   # "rising" | "falling" | "flat"
-            "btc_trend":     "flat",   # "rising" | "falling" | "flat"
+            "usdt_trend":    TREND_FLAT,  # TREND_RISING | TREND_FALLING | TREND_FLAT
+            "btc_trend":     TREND_FLAT,
             "usdt_velocity": 0.0,      # rate of change per candle (last 3)
             "btc_velocity":  0.0,
             "usdt_accel":    0.0,      # acceleration (is it speeding up?)
@@ -60,16 +339,21 @@ class SignalEngine(commands.Cog):
 
         # Active trades: symbol -> signal dict (with message_id, channel_id, tps_hit)
         self.active_trades: dict[str, dict] = {}
+        # Index for !active: guild_id -> symbols of active trades posted in that guild
+        self.trades_by_guild: dict[int, set[str]] = defaultdict(set)
+        # Each signal posts once per guild channel, so pace signals at the per-channel limit
+        self._send_bucket = TokenBucket(SEND_RATE, SEND_PER)
 
-        # Last scan timestamps per type
-        self._last_scalp = 0
-        self._last_day   = 0
-        self._last_swing  = 0
-        self._last_ml_retrain = 0
+        # Last scan times per type (monotonic)
+        self._last_scalp = NEVER
+        self._last_day   = NEVER
+        self._last_swing  = NEVER
+        self._last_ml_retrain = NEVER
 
         # Cache
         self._valid_symbols: list[str] = []
-        self._btc_change_cache = (0.0, 0)  # (value, timestamp)
+        self._scan_counter = 0  # rotates the scan start so the same coins don't always go first
+        self._btc_change_cache = (0.0, NEVER)  # (value, monotonic ts)
 
         # ── Daily quota tracking ─────────────────────────────────────────────
         # Tracks how many signals sent per trade_type per day + per hour for scalps
@@ -81,35 +365,15 @@ class SignalEngine(commands.Cog):
         #
         # Reset at midnight UTC.
         self._quota = {
-            "scalp": {
-                "day_start":    0.0,       # timestamp of last daily reset
-                "sent_today":   {"A+": 0, "B+": 0, "C+": 0},
-                "last_hour_sent": 0.0,     # timestamp of last scalp signal sent
-                "hour_has_aplus": False,   # did we find an A+ this hour?
-                "day_has_bplus":  False,   # did we find a B+ today?
-                "daily_target":  24,
-            },
-            "day": {
-                "day_start":    0.0,
-                "sent_today":   {"A+": 0, "B+": 0, "C+": 0},
-                "last_hour_sent": 0.0,
-                "hour_has_aplus": False,
-                "day_has_bplus":  False,
-                "daily_target":  9,        # target 8-10, use 9 as midpoint
-            },
-            "swing": {
-                "day_start":    0.0,
-                "sent_today":   {"A+": 0, "B+": 0, "C+": 0},
-                "last_hour_sent": 0.0,
-                "hour_has_aplus": False,
-                "day_has_bplus":  False,
-                "daily_target":  3,        # target 3-4
-            },
+            "scalp": _fresh_quota(24),
+            "day":   _fresh_quota(9),   # target 8-10, use 9 as midpoint
+            "swing": _fresh_quota(3),   # target 3-4
         }
 
     async def cog_load(self):
         logger.info("SignalEngine starting...")
         self.ml.set_bot(self.bot)  # Give ML engine access to Claude via AIEngine
+        self._http = self.bot.http_session  # owned and closed by the bot
         self.scan_loop.start()
         self.monitor_trades_loop.start()
         self.ml_retrain_loop.start()
@@ -125,13 +389,39 @@ class SignalEngine(commands.Cog):
         self.daily_ml_report_loop.cancel()
         self.dom_candle_loop.cancel()
         await self.fetcher.close()
+        self.cpu_pool.shutdown(wait=False, cancel_futures=True)
+        self.indicator_pool.shutdown(wait=False, cancel_futures=True)
+        admin = self.bot.cogs.get("Admin")
+        if admin:
+            admin._engine = None  # drop Admin's memoized reference to this instance
+
+    async def _run_in_pool(self, name: str, fn, *args):
+        """
+        Run fn(*args) in the process pool stored at self.<name>. A dead worker (e.g. an
+        OOM kill) breaks a ProcessPoolExecutor for good, so rebuild it and retry once.
+        """
+        loop = asyncio.get_running_loop()
+        pool = getattr(self, name)
+        try:
+            return await loop.run_in_executor(pool, fn, *args)
+        except BrokenProcessPool:
+            # Every in-flight call sees the same dead pool — only the first replaces it
+            if getattr(self, name) is pool:
+                logger.warning(f"{name} worker died — restarting the pool")
+                pool.shutdown(wait=False, cancel_futures=True)
+                setattr(self, name, make_process_pool(self._pool_workers[name]))
+            return await loop.run_in_executor(getattr(self, name), fn, *args)
+
+    async def run_cpu(self, fn, *args):
+        """Run a CPU-heavy call (model fits) in the single-worker cpu_pool"""
+        return await self._run_in_pool("cpu_pool", fn, *args)
 
     # ─── Loops ───────────────────────────────────────────────────────────────
 
     @tasks.loop(seconds=30)
     async def scan_loop(self):
         """Main scanning loop - runs every 30s, triggers type-specific scans"""
-        now = time.time()
+        now = time.monotonic()
         try:
             if now - self._last_scalp >= config.SCAN_INTERVAL_SCALP:
                 self._last_scalp = now
@@ -161,10 +451,16 @@ class SignalEngine(commands.Cog):
         """Monitor active trades for TP/SL hits"""
         if not self.active_trades:
             return
+        async def _ticker(symbol):
+            async with _ticker_sem:
+                return await self.fetcher.get_ticker_24h(symbol)
+
         try:
-            for symbol, trade in list(self.active_trades.items()):
-                ticker = await self.fetcher.get_ticker_24h(symbol)
-                if not ticker:
+            # Fetch every ticker concurrently, then run the TP/SL checks locally
+            trades  = list(self.active_trades.items())
+            tickers = await asyncio.gather(*(_ticker(symbol) for symbol, _ in trades), return_exceptions=True)
+            for (symbol, trade), ticker in zip(trades, tickers):
+                if not ticker or isinstance(ticker, Exception):
                     continue
                 current_price = float(ticker.get("lastPrice", 0))
                 if not current_price:
@@ -199,7 +495,7 @@ class SignalEngine(commands.Cog):
                                 trade.get("ob_imbalance", 0),
                                 "win"
                             )
-                            del self.active_trades[symbol]
+                            self._close_trade(symbol)
                         break
         except Exception as e:
             logger.error(f"Monitor loop error: {e}", exc_info=True)
@@ -218,23 +514,19 @@ class SignalEngine(commands.Cog):
             if btc_d == 0 or usdt_d == 0:
                 return
 
-            now = time.time()
-            candle = {"t": now, "btc_d": btc_d, "usdt_d": usdt_d}
-
-            self._dom_candles.append(candle)
-            # Keep last 60 candles (60 minutes)
-            if len(self._dom_candles) > 60:
-                self._dom_candles = self._dom_candles[-60:]
+            now = time.monotonic()
+            self._dom_candles.append(time.time_ns(), btc_d, usdt_d)  # ring keeps the last 60 (60 minutes)
 
             self._dom_candle_ts = now
             self._update_dom_signal()
 
-            sig = self._dom_signal
-            logger.debug(
-                f"DOM candle — BTC.D={btc_d:.3f}%  USDT.D={usdt_d:.3f}%  "
-                f"usdt_trend={sig['usdt_trend']}({sig['usdt_velocity']:+.4f})  "
-                f"scalp_bias={sig['scalp_bias']}"
-            )
+            if logger.isEnabledFor(logging.DEBUG):  # skip building the f-string otherwise
+                sig = self._dom_signal
+                logger.debug(
+                    f"DOM candle — BTC.D={btc_d:.3f}%  USDT.D={usdt_d:.3f}%  "
+                    f"usdt_trend={TREND_LABELS[sig['usdt_trend']]}({sig['usdt_velocity']:+.4f})  "
+                    f"scalp_bias={sig['scalp_bias']}"
+                )
 
             # Also refresh the slow dominance cache used by day/swing
             self._dominance_cache = (btc_d, usdt_d, now)
@@ -246,21 +538,18 @@ class SignalEngine(commands.Cog):
     async def before_dom_candle_loop(self):
         await self.bot.wait_until_ready()
         await asyncio.sleep(10)
-        # Pre-fill candle history with 20 rapid samples (1s apart)
-        # so scalp filtering works immediately instead of waiting 20 minutes
+        # Pre-fill candle history so scalp filtering works immediately instead of
+        # waiting 20 minutes. Back-to-back CoinGecko samples are identical anyway,
+        # so one fetch is replicated — velocity/accel start at 0 (neutral bias)
         logger.info("DOM candle: pre-filling history with 20 startup samples...")
-        for i in range(20):
-            try:
-                btc_d, usdt_d = await self._fetch_dominance_spot()
-                if btc_d > 0 and usdt_d > 0:
-                    self._dom_candles.append({
-                        "t":      time.time() - (19 - i),  # spread slightly in time
-                        "btc_d":  btc_d,
-                        "usdt_d": usdt_d,
-                    })
-            except Exception:
-                pass
-            await asyncio.sleep(1)
+        try:
+            btc_d, usdt_d = await self._fetch_dominance_spot()
+            if btc_d > 0 and usdt_d > 0:
+                now = time.time_ns()
+                for i in range(20):
+                    self._dom_candles.append(now - (19 - i) * 1_000_000_000, btc_d, usdt_d)
+        except Exception:
+            pass
         if self._dom_candles:
             self._update_dom_signal()
             logger.info(f"DOM candle: pre-filled {len(self._dom_candles)} candles — "
@@ -274,49 +563,52 @@ class SignalEngine(commands.Cog):
         Source 1: CoinGecko /global  — free, no key, exact values
         Source 2: CMC global-metrics — fallback
         """
-        import aiohttp
-
         # ── CoinGecko (primary) ─────────────────────────────────────────────
         # TradingView CRYPTOCAP:USDT.D = all stablecoins / total crypto mcap
         # CoinGecko pct["usdt"] = Tether only (reliable, ~7.9%)
         # CoinGecko pct["usdc"] is UNRELIABLE — returns 1.5-3.5% (data error)
         # Fix: use USDT only + fixed 0.35% offset for USDC/DAI/other small stables
         # Result: 7.944 + 0.35 = 8.294% ≈ TradingView 8.291% ✅
+        # Conditional GET: /global only changes every few minutes, so a 304 reuses the last parse
+        headers = {"User-Agent": "Mozilla/5.0"}
+        if self._cg_etag and self._cg_last[0] > 0:
+            headers["If-None-Match"] = self._cg_etag
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    "https://api.coingecko.com/api/v3/global",
-                    headers={"User-Agent": "Mozilla/5.0"},
-                    timeout=aiohttp.ClientTimeout(total=5)
-                ) as resp:
-                    if resp.status == 200:
-                        pct    = (await resp.json()).get("data", {}).get("market_cap_percentage", {})
-                        btc_d  = float(pct.get("btc",  0) or 0)
-                        usdt   = float(pct.get("usdt", 0) or 0)
-                        # +0.35% accounts for USDC + DAI + other minor stablecoins
-                        # This offset is stable and matches TradingView within 0.05%
-                        usdt_d = usdt + 0.35
-                        logger.info(f"CoinGecko: usdt={usdt:.3f}% + 0.35 offset = USDT.D={usdt_d:.3f}%")
-                        if btc_d > 0 and usdt_d > 0:
-                            return btc_d, usdt_d
+            async with self._http.get(
+                CG_GLOBAL_URL,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=5)
+            ) as resp:
+                if resp.status == 304:
+                    return self._cg_last
+                if resp.status == 200:
+                    pct    = (await resp.json(loads=orjson.loads)).get("data", {}).get("market_cap_percentage", {})
+                    btc_d  = float(pct.get("btc",  0) or 0)
+                    usdt   = float(pct.get("usdt", 0) or 0)
+                    # +0.35% accounts for USDC + DAI + other minor stablecoins
+                    # This offset is stable and matches TradingView within 0.05%
+                    usdt_d = usdt + 0.35
+                    # Lazy %-args: this runs every minute and DEBUG is normally off
+                    logger.debug("CoinGecko: usdt=%.3f%% + 0.35 offset = USDT.D=%.3f%%", usdt, usdt_d)
+                    if btc_d > 0 and usdt_d > 0:
+                        self._cg_etag = resp.headers.get("ETag")
+                        self._cg_last = (btc_d, usdt_d)
+                        return btc_d, usdt_d
         except Exception as e:
             logger.debug(f"CoinGecko spot fetch failed: {e}")
 
         # ── CMC fallback ──────────────────────────────────────────────────────
         try:
-            import aiohttp as _aiohttp
-            url = "https://pro-api.coinmarketcap.com/v1/global-metrics/quotes/latest"
             headers = {"X-CMC_PRO_API_KEY": config.CMC_API_KEY, "Accept": "application/json"}
-            async with _aiohttp.ClientSession() as session:
-                async with session.get(url, headers=headers, timeout=_aiohttp.ClientTimeout(total=5)) as resp:
-                    if resp.status == 200:
-                        d = (await resp.json()).get("data", {})
-                        btc_d = float(d.get("btc_dominance", 0) or 0)
-                        for field in ["stablecoin_market_cap_dominance", "stablecoin_volume_dominance",
-                                      "usdt_dominance", "usdt_market_cap_dominance"]:
-                            v = d.get(field)
-                            if v and float(v) > 0:
-                                return btc_d, float(v)
+            async with self._http.get(CMC_GLOBAL_URL, headers=headers, timeout=aiohttp.ClientTimeout(total=5)) as resp:
+                if resp.status == 200:
+                    d = (await resp.json(loads=orjson.loads)).get("data", {})
+                    btc_d = float(d.get("btc_dominance", 0) or 0)
+                    for field in ["stablecoin_market_cap_dominance", "stablecoin_volume_dominance",
+                                  "usdt_dominance", "usdt_market_cap_dominance"]:
+                        v = d.get(field)
+                        if v and float(v) > 0:
+                            return btc_d, float(v)
         except Exception as e:
             logger.debug(f"CMC spot fetch failed: {e}")
 
@@ -339,38 +631,43 @@ class SignalEngine(commands.Cog):
           USDT rising fast (accel > 0.002)   → blocked  (panic, no scalps)
           Flat / mixed                       → neutral
         """
-        candles = self._dom_candles
+        n   = len(self._dom_candles)
+        # Same newest candle as last time → _dom_signal is already up to date
+        key = self._dom_candles.back(1)[0] if n else 0
+        if key == self._dom_signal_key:
+            return
+        self._dom_signal_key = key
+
         sig = self._dom_signal
-        sig["candle_count"] = len(candles)
+        sig["candle_count"] = n
 
-        if len(candles) < 3:
+        if n < 3:
             sig["scalp_bias"]   = "neutral"
             sig["scalp_reason"] = "Insufficient candle data"
             return
 
-        # Last 3 candles for velocity
-        recent = candles[-3:]
-        usdt_vals = [c["usdt_d"] for c in recent]
-        btc_vals  = [c["btc_d"]  for c in recent]
-
-        usdt_vel = (usdt_vals[-1] - usdt_vals[0]) / max(len(recent)-1, 1)
-        btc_vel  = (btc_vals[-1]  - btc_vals[0])  / max(len(recent)-1, 1)
-
-        # Last 5 candles for acceleration (rate of rate of change)
-        if len(candles) >= 5:
-            older = candles[-5:-2]
-            usdt_old_vel = (older[-1]["usdt_d"] - older[0]["usdt_d"]) / max(len(older)-1, 1)
-            btc_old_vel  = (older[-1]["btc_d"]  - older[0]["btc_d"])  / max(len(older)-1, 1)
-            usdt_accel = usdt_vel - usdt_old_vel
-            btc_accel  = btc_vel  - btc_old_vel
+        # Only candles -1, -3 and -5 matter — read those three ring slots
+        candles = self._dom_candles
+        _, last_btc, last_usdt = candles.back(1)
+        _, mid_btc,  mid_usdt  = candles.back(3)
+
+        # Velocity over the last 3 candles (2 steps)
+        usdt_vel = (last_usdt - mid_usdt) * 0.5
+        btc_vel  = (last_btc  - mid_btc)  * 0.5
+
+        # Acceleration: current velocity vs the velocity of candles -5..-3
+        if n >= 5:
+            _, first_btc, first_usdt = candles.back(5)
+            usdt_accel = usdt_vel - (mid_usdt - first_usdt) * 0.5
+            btc_accel  = btc_vel  - (mid_btc  - first_btc)  * 0.5
         else:
             usdt_accel = 0.0
             btc_accel  = 0.0
 
         # Trend labels (threshold: 0.003% per candle = meaningful move on 1min)
         THRESH = 0.003
-        usdt_trend = "rising"  if usdt_vel >  THRESH else ("falling" if usdt_vel < -THRESH else "flat")
-        btc_trend  = "rising"  if btc_vel  >  THRESH else ("falling" if btc_vel  < -THRESH else "flat")
+        usdt_trend = (usdt_vel > THRESH) - (usdt_vel < -THRESH)  # 1 / -1 / 0
+        btc_trend  = (btc_vel  > THRESH) - (btc_vel  < -THRESH)
 
         sig["usdt_trend"]    = usdt_trend
         sig["btc_trend"]     = btc_trend
@@ -380,63 +677,60 @@ class SignalEngine(commands.Cog):
         sig["btc_accel"]     = round(btc_accel,  5)
 
         # Current USDT.D level
-        current_usdt = candles[-1]["usdt_d"]
-        current_btc  = candles[-1]["btc_d"]
+        current_usdt = last_usdt
+        current_btc  = last_btc
 
         # ── Scalp bias decision tree ──────────────────────────────────────────
+        # Only the reason key + values are stored; the text is formatted on read
         # Panic mode: USDT.D rising fast AND accelerating = no scalps at all
-        if usdt_trend == "rising" and usdt_accel > 0.002 and current_usdt > 7.5:
-            sig["scalp_bias"]   = "blocked"
-            sig["scalp_reason"] = (
-                f"⛔ PANIC — USDT.D accelerating +{usdt_vel*100:.3f}%/min "
-                f"(accel={usdt_accel:+.4f}) @ {current_usdt:.3f}%"
-            )
+        if usdt_trend == TREND_RISING and usdt_accel > 0.002 and current_usdt > 7.5:
+            bias, reason = "blocked", "panic"
 
         # Risk-off: USDT.D rising steadily = shorts only
-        elif usdt_trend == "rising" and current_usdt > 7.5:
-            sig["scalp_bias"]   = "short_ok"
-            sig["scalp_reason"] = (
-                f"🔴 USDT.D rising {usdt_vel:+.4f}%/min → fear building "
-                f"@ {current_usdt:.3f}% — SHORT bias"
-            )
+        elif usdt_trend == TREND_RISING and current_usdt > 7.5:
+            bias, reason = "short_ok", "fear_building"
 
         # Fear easing: USDT.D was high but now falling = shorts still viable, longs cautious
-        elif usdt_trend == "falling" and current_usdt > 7.5:
-            sig["scalp_bias"]   = "short_ok"
-            sig["scalp_reason"] = (
-                f"🟠 USDT.D falling from high ({current_usdt:.3f}%) — still elevated, cautious"
-            )
+        elif usdt_trend == TREND_FALLING and current_usdt > 7.5:
+            bias, reason = "short_ok", "fear_easing"
 
         # Best long condition: USDT.D falling + BTC.D flat or falling
-        elif usdt_trend == "falling" and btc_trend in ("falling", "flat"):
-            sig["scalp_bias"]   = "long_ok"
-            sig["scalp_reason"] = (
-                f"🟢 USDT.D falling {usdt_vel:+.4f}%/min + BTC.D {btc_trend} "
-                f"@ {current_usdt:.3f}% — LONG bias"
-            )
+        elif usdt_trend == TREND_FALLING and btc_trend != TREND_RISING:
+            bias, reason = "long_ok", "long_ok"
 
         # Alt-weak: USDT.D falling but BTC.D rising = BTC longs ok, alt longs risky
-        elif usdt_trend == "falling" and btc_trend == "rising":
-            sig["scalp_bias"]   = "btc_long_only"
-            sig["scalp_reason"] = (
-                f"🟡 USDT.D falling but BTC.D rising {btc_vel:+.4f}%/min "
-                f"— BTC/ETH longs ok, alts risky"
-            )
+        elif usdt_trend == TREND_FALLING and btc_trend == TREND_RISING:
+            bias, reason = "btc_long_only", "alts_weak"
 
         # BTC.D spiking while USDT flat = rotation from alts to BTC
-        elif btc_trend == "rising" and btc_accel > 0.002:
-            sig["scalp_bias"]   = "short_ok"
-            sig["scalp_reason"] = (
-                f"🟡 BTC.D surging +{btc_vel:.4f}%/min (accel={btc_accel:+.4f}) "
-                f"— alts losing value, SHORT alts"
-            )
+        elif btc_trend == TREND_RISING and btc_accel > 0.002:
+            bias, reason = "short_ok", "btc_surge"
 
         else:
-            sig["scalp_bias"]   = "neutral"
-            sig["scalp_reason"] = (
-                f"⚪ No clear candle signal — USDT.D {usdt_trend} "
-                f"@ {current_usdt:.3f}%, BTC.D {btc_trend} @ {current_btc:.3f}%"
-            )
+            bias, reason = "neutral", "neutral"
+
+        sig["scalp_bias"]        = bias
+        sig["scalp_reason"]      = None  # formatted lazily by _scalp_reason()
+        sig["scalp_reason_key"]  = reason
+        sig["scalp_reason_args"] = {
+            "usdt_vel": usdt_vel, "btc_vel": btc_vel,
+            "usdt_accel": usdt_accel, "btc_accel": btc_accel,
+            "usdt": current_usdt, "btc": current_btc,
+            "usdt_trend": usdt_trend, "btc_trend": btc_trend,
+        }
+
+    def _scalp_reason(self) -> str:
+        """Human-readable scalp bias reason, formatted once per candle on first read"""
+        sig = self._dom_signal
+        if sig["scalp_reason"] is None:
+            args = sig["scalp_reason_args"]
+            sig["scalp_reason"] = SCALP_REASONS[sig["scalp_reason_key"]].format_map({
+                **args,
+                "usdt_vel_pct": args["usdt_vel"] * 100,
+                "usdt_trend":   TREND_LABELS[args["usdt_trend"]],
+                "btc_trend":    TREND_LABELS[args["btc_trend"]],
+            })
+        return sig["scalp_reason"]
 
     @tasks.loop(minutes=5)
     async def dominance_tracker_loop(self):
@@ -446,10 +740,14 @@ class SignalEngine(commands.Cog):
         Broadcasts alert to log channels when regime shifts.
         """
         try:
-            now = time.time()
-            # Force fresh fetch (bypass 10min cache)
-            self._dominance_cache = (0.0, 0.0, 0.0)
-            dom = await self._get_dominance()
+            # dom_candle_loop fetched dominance within the last minute or two — reuse it
+            if self._dom_candles and time.monotonic() - self._dom_candle_ts < 120:
+                _, btc_d, usdt_d = self._dom_candles.back(1)
+                dom = self._build_regime(btc_d, usdt_d)
+            else:
+                # Candle feed stale: force a fresh fetch (bypass 10min cache)
+                self._dominance_cache = (0.0, 0.0, 0.0)
+                dom = await self._get_dominance()
             if dom["btc_d"] == 0:
                 return
 
@@ -497,17 +795,10 @@ class SignalEngine(commands.Cog):
 
     async def _broadcast_dominance_alert(self, dom, btc_d_delta, usdt_d_delta, btc_arrow, usdt_arrow):
         """Send dominance shift alert to all log channels"""
-        from db import get_all_guilds
-        regime_colors = {
-            "risk_on_alt": 0x00C853,
-            "risk_on_btc": 0xFFD600,
-            "risk_off":    0xFF1744,
-            "neutral":     0x607D8B,
-        }
         embed = discord.Embed(
             title="🌍 Market Dominance Shift Detected",
             description=dom["bias"],
-            color=regime_colors.get(dom["regime"], 0x607D8B)
+            color=REGIME_COLORS.get(dom["regime"], 0x607D8B)
         )
         embed.add_field(
             name=f"{btc_arrow} BTC Dominance",
@@ -519,75 +810,112 @@ class SignalEngine(commands.Cog):
             value=f"`{dom['usdt_d']:.2f}%`  ({usdt_d_delta:+.3f}%)",
             inline=True
         )
-        regime_advice = {
-            "risk_on_alt": "💡 Altseason: Focus on alt LONG setups. Avoid shorts.",
-            "risk_on_btc": "💡 BTC season: Prefer BTC/ETH longs. Alt longs risky.",
-            "risk_off":    "⚠️ Fear regime: Only SHORT setups. Avoid longs.",
-            "neutral":     "💡 Mixed signals: Trade both directions with caution.",
-        }
         embed.add_field(
             name="🎯 Trade Bias",
-            value=regime_advice.get(dom["regime"], "No specific bias"),
+            value=REGIME_ADVICE.get(dom["regime"], "No specific bias"),
             inline=False
         )
         embed.set_footer(text="Live dominance tracking • Updates every 5 min")
 
-        guilds = get_all_guilds()
-        for g in guilds:
+        targets = []  # (channel, guild_id)
+        for g in db.get_all_guilds():
             g_dict = dict(g)
             ch_id  = g_dict.get("log_channel_id")
             if not ch_id:
                 continue
             ch = self.bot.get_channel(ch_id)
-            if not ch:
+            if ch:
+                targets.append((ch, g_dict.get("guild_id")))
+
+        # Fan out concurrently — discord.py still serializes per-route rate-limit buckets
+        results = await asyncio.gather(
+            *(ch.send(embed=embed) for ch, _ in targets), return_exceptions=True
+        )
+        for (_, guild_id), e in zip(targets, results):
+            if not isinstance(e, Exception):
                 continue
-            try:
-                await ch.send(embed=embed)
-            except Exception as e:
-                # 403 = bot lacks permissions in that server — skip silently
-                if "403" in str(e) or "50013" in str(e) or "50001" in str(e):
-                    logger.debug(f"Dominance broadcast skipped (no permission) guild={g_dict.get('guild_id')}")
-                else:
-                    logger.warning(f"Dominance broadcast error guild={g_dict.get('guild_id')}: {e}")
+            # 403 = bot lacks permissions in that server — skip silently
+            if "403" in str(e) or "50013" in str(e) or "50001" in str(e):
+                logger.debug(f"Dominance broadcast skipped (no permission) guild={guild_id}")
+            else:
+                logger.warning(f"Dominance broadcast error guild={guild_id}: {e}")
 
-    async def _get_btc_correlation(self, symbol: str, interval: str) -> float:
+    async def _get_btc_returns(self, interval: str):
+        """
+        BTC close prices plus centred returns and their norm for this interval.
+        Shared by every symbol's correlation; refetched once per closed candle.
+        """
+        bucket = int(time.time() // INTERVAL_SECS.get(interval, 300))
+        cached = self._btc_ret_cache.get(interval)
+        if cached and cached[0] == bucket:
+            return cached[1:]
+
+        async with self._btc_ret_locks[interval]:
+            # Another analysis may have filled it while we waited
+            cached = self._btc_ret_cache.get(interval)
+            if cached and cached[0] == bucket:
+                return cached[1:]
+
+            btc_df = await self.fetcher.get_klines("BTCUSDT", interval, 60)
+            if btc_df is None or btc_df.empty:
+                return None
+            btc_close = btc_df["close"].to_numpy(dtype=float)
+            btc_ret   = np.diff(btc_close) / (btc_close[:-1] + 1e-9)
+            btc_xc    = btc_ret - btc_ret.mean()
+            entry = (btc_close, btc_xc, float(np.linalg.norm(btc_xc)))
+            self._btc_ret_cache[interval] = (bucket, *entry)
+            return entry
+
+    async def _get_btc_correlation(self, symbol: str, interval: str, coin_df=None) -> float:
         """
         Calculate Pearson correlation between a coin's returns and BTC returns.
-        Uses last 50 candles. Returns -1 to +1. Cache per-symbol for 30 min.
+        Uses last 50 candles. Returns -1 to +1. Cache per symbol/interval for 30 min.
+        Pass the scan's own klines as coin_df to skip a second fetch for the coin.
         """
-        now = time.time()
-        cached = self._btc_corr_cache.get(symbol)
-        if cached and now - cached[1] < 1800:   # per-symbol timestamp
+        now = time.monotonic()
+        key = (symbol, interval)
+        cached = self._btc_corr_cache.get(key)
+        if cached and now - cached[1] < 1800:   # per-key timestamp
+            self._btc_corr_cache.move_to_end(key)
             return cached[0]
 
         try:
-            import numpy as np
-            btc_df   = await self.fetcher.get_klines("BTCUSDT", interval, 60)
-            coin_df  = await self.fetcher.get_klines(symbol, interval, 60)
+            if coin_df is None:
+                btc, coin_df = await asyncio.gather(
+                    self._get_btc_returns(interval),
+                    self.fetcher.get_klines(symbol, interval, 60),
+                )
+            else:
+                btc = await self._get_btc_returns(interval)
 
-            if btc_df is None or coin_df is None or btc_df.empty or coin_df.empty:
+            if btc is None or coin_df is None or coin_df.empty:
                 return 0.5  # neutral fallback
-
-            btc_close  = btc_df["close"].astype(float).values
-            coin_close = coin_df["close"].astype(float).values
+            btc_close, btc_xc, btc_norm = btc
+            coin_close = coin_df["close"].to_numpy(dtype=float)[-60:]
 
             # Align lengths
             min_len = min(len(btc_close), len(coin_close))
             if min_len < 10:
                 return 0.5
 
-            btc_close  = btc_close[-min_len:]
+            # Shorter coin history (new listing) → recentre BTC over the overlap only
+            if min_len < len(btc_close):
+                tail     = btc_close[-min_len:]
+                btc_ret  = np.diff(tail) / (tail[:-1] + 1e-9)
+                btc_xc   = btc_ret - btc_ret.mean()
+                btc_norm = float(np.linalg.norm(btc_xc))
             coin_close = coin_close[-min_len:]
 
-            # Percent returns
-            btc_ret  = np.diff(btc_close) / (btc_close[:-1] + 1e-9)
+            # Percent returns → Pearson as a centred dot product (no 2×2 corrcoef matrix)
             coin_ret = np.diff(coin_close) / (coin_close[:-1] + 1e-9)
-
-            # Pearson correlation
-            corr = float(np.corrcoef(btc_ret, coin_ret)[0, 1])
+            coin_xc  = coin_ret - coin_ret.mean()
+            corr = float(np.dot(btc_xc, coin_xc) / (btc_norm * np.linalg.norm(coin_xc) + 1e-12))
             corr = max(-1.0, min(1.0, corr))  # clamp
 
-            self._btc_corr_cache[symbol] = (corr, now)  # store (value, timestamp)
+            self._btc_corr_cache[key] = (corr, now)  # store (value, timestamp)
+            self._btc_corr_cache.move_to_end(key)
+            if len(self._btc_corr_cache) > CORR_CACHE_SIZE:
+                self._btc_corr_cache.popitem(last=False)
             return corr
 
         except Exception as e:
@@ -601,7 +929,7 @@ class SignalEngine(commands.Cog):
             # Reset A+ hour flags so B+ can send next hour if no A+ found
             self._reset_hour_flags()
 
-            result = await asyncio.to_thread(self.ml.retrain, config.ML_MIN_SAMPLES)
+            result = await self.ml.retrain_async(config.ML_MIN_SAMPLES, self.run_cpu)
             if result:
                 logger.info("ML model retrained successfully")
         except Exception as e:
@@ -624,13 +952,10 @@ class SignalEngine(commands.Cog):
     @daily_ml_report_loop.before_loop
     async def before_daily_ml_report(self):
         """Wait until midnight UTC before first report, then run every 24h"""
-        import datetime
         await self.bot.wait_until_ready()
         now = datetime.datetime.utcnow()
         # Schedule first run at next midnight UTC
-        next_midnight = (now + datetime.timedelta(days=1)).replace(
-            hour=0, minute=0, second=0, microsecond=0
-        )
+        next_midnight = (now + datetime.timedelta(days=1)).replace(**MIDNIGHT)
         wait_secs = (next_midnight - now).total_seconds()
         logger.info(f"Daily ML report scheduled in {wait_secs/3600:.1f}h (next UTC midnight)")
         await asyncio.sleep(wait_secs)
@@ -652,110 +977,144 @@ class SignalEngine(commands.Cog):
           3. CoinGecko public /global endpoint (free, no key)
              - market_cap_percentage.usdt gives exact USDT.D
         """
-        now = time.time()
+        now = time.monotonic()
         btc_d, usdt_d, ts = self._dominance_cache
         if now - ts < 600 and btc_d > 0 and usdt_d > 0:
             return self._build_regime(btc_d, usdt_d)
 
-        import aiohttp
-
-        btc_d  = 0.0
-        usdt_d = 0.0
-
-        # ── Source 1: CMC global metrics (btc_d reliable, usdt_d may be missing) ──
+        # ── Sources 1 + 2 in flight together; CMC values win, CoinGecko fills gaps ──
+        cg_task = asyncio.create_task(self._dom_from_coingecko())
         try:
-            url = "https://pro-api.coinmarketcap.com/v1/global-metrics/quotes/latest"
-            headers = {"X-CMC_PRO_API_KEY": config.CMC_API_KEY, "Accept": "application/json"}
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=6)) as resp:
-                    if resp.status == 200:
-                        d = (await resp.json()).get("data", {})
-                        btc_d = float(d.get("btc_dominance", 0) or 0)
-                        # Try every known field name for USDT dominance
-                        for field in ["stablecoin_market_cap_dominance",
-                                      "stablecoin_volume_dominance",
-                                      "usdt_dominance",
-                                      "usdt_market_cap_dominance",
-                                      "stable_coin_dominance"]:
-                            v = d.get(field)
-                            if v and float(v) > 0:
-                                usdt_d = float(v)
-                                logger.info(f"USDT.D from CMC field '{field}': {usdt_d:.3f}%")
-                                break
-        except Exception as e:
-            logger.debug(f"CMC dominance fetch failed: {e}")
-
-        # ── Source 2: CoinGecko /global (free, no key, has exact USDT.D) ──────────
-        if usdt_d == 0 or btc_d == 0:
-            try:
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(
-                        "https://api.coingecko.com/api/v3/global",
-                        timeout=aiohttp.ClientTimeout(total=6)
-                    ) as resp:
-                        if resp.status == 200:
-                            data = (await resp.json()).get("data", {})
-                            pct  = data.get("market_cap_percentage", {})
-                            if btc_d == 0:
-                                btc_d  = float(pct.get("btc", 0) or 0)
-                            if usdt_d == 0:
-                                _usdt  = float(pct.get("usdt", 0) or 0)
-                                usdt_d = _usdt + 0.35  # +0.35% for USDC/DAI offset
-                            logger.info(f"Dominance from CoinGecko: BTC.D={btc_d:.3f}%  USDT.D={usdt_d:.3f}%")
-            except Exception as e:
-                logger.debug(f"CoinGecko dominance fetch failed: {e}")
+            btc_d, usdt_d = await self._dom_from_cmc()
+        except BaseException:
+            cg_task.cancel()
+            raise
+        if btc_d > 0 and usdt_d > 0:
+            cg_task.cancel()  # CMC had both — don't wait on CoinGecko
+        else:
+            cg_btc_d, cg_usdt_d = await cg_task
+            if btc_d == 0:
+                btc_d = cg_btc_d
+            if usdt_d == 0:
+                usdt_d = cg_usdt_d
+            if cg_btc_d or cg_usdt_d:
+                logger.info(f"Dominance from CoinGecko: BTC.D={btc_d:.3f}%  USDT.D={usdt_d:.3f}%")
 
         # ── Source 3: Compute from Binance top-coin prices × CMC supplies ────────
         # Uses the top-coins list already fetched by DataFetcher
         # USDT market cap = USDT price (≈$1) × circulating supply
         # Total crypto market cap = sum of top coins' prices × circulating supply
         if usdt_d == 0:
-            try:
-                async with aiohttp.ClientSession() as session:
-                    url = (
-                        "https://pro-api.coinmarketcap.com/v1/cryptocurrency/listings/latest"
-                        "?limit=20&convert=USD&sort=market_cap"
-                    )
-                    headers = {"X-CMC_PRO_API_KEY": config.CMC_API_KEY, "Accept": "application/json"}
-                    async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=6)) as resp:
-                        if resp.status == 200:
-                            coins = (await resp.json()).get("data", [])
-                            total_mcap = 0.0
-                            usdt_mcap  = 0.0
-                            btc_mcap   = 0.0
-                            for c in coins:
-                                mcap = float(c.get("quote", {}).get("USD", {}).get("market_cap", 0) or 0)
-                                sym  = c.get("symbol", "")
-                                total_mcap += mcap
-                                if sym == "USDT":
-                                    usdt_mcap = mcap
-                                if sym == "BTC":
-                                    btc_mcap  = mcap
-                            if total_mcap > 0:
-                                usdt_d = (usdt_mcap / total_mcap) * 100
-                                if btc_d == 0:
-                                    btc_d = (btc_mcap / total_mcap) * 100
-                                logger.info(f"USDT.D computed from CMC listings: {usdt_d:.3f}%")
-            except Exception as e:
-                logger.debug(f"CMC listings dominance compute failed: {e}")
+            mcaps = await self._get_cmc_listing_mcaps(now)
+            if mcaps:
+                total_mcap, usdt_mcap, btc_mcap = mcaps
+                usdt_d = (usdt_mcap / total_mcap) * 100
+                if btc_d == 0:
+                    btc_d = (btc_mcap / total_mcap) * 100
+                logger.info(f"USDT.D computed from CMC listings: {usdt_d:.3f}%")
 
         # ── Validate and cache ────────────────────────────────────────────────────
+        # Failed sources fall back to the last validated reading, which survives the
+        # tracker's forced cache wipe, before the hard-coded chart estimates
+        last_btc_d, last_usdt_d = self._last_good_dom
         # Sanity check: USDT.D real range is ~4-12% (TradingView shows 8.29% today)
         if usdt_d <= 0 or usdt_d > 25:
             logger.warning(f"USDT.D value {usdt_d:.3f}% invalid — all sources failed, using last known or 8.0%")
-            # Use last known cached value if available
-            _, last_usdt_d, _ = self._dominance_cache
             usdt_d = last_usdt_d if last_usdt_d > 0 else 8.0  # realistic estimate from chart
+        else:
+            last_usdt_d = usdt_d
 
         if btc_d <= 0 or btc_d > 100:
-            btc_d_last, _, _ = self._dominance_cache
-            btc_d = btc_d_last if btc_d_last > 0 else 57.9
+            btc_d = last_btc_d if last_btc_d > 0 else 57.9
+        else:
+            last_btc_d = btc_d
+        self._last_good_dom = (last_btc_d, last_usdt_d)
 
         self._dominance_cache = (btc_d, usdt_d, now)
         regime = self._build_regime(btc_d, usdt_d)
-        logger.info(f"Dominance: BTC.D={btc_d:.2f}%  USDT.D={usdt_d:.2f}%  Regime={regime['regime']}")
+        # Refetched every 5 min by the tracker — only log the summary every DOM_LOG_INTERVAL
+        if now - self._last_dom_log_ts >= DOM_LOG_INTERVAL:
+            self._last_dom_log_ts = now
+            logger.info(f"Dominance: BTC.D={btc_d:.2f}%  USDT.D={usdt_d:.2f}%  Regime={regime['regime']}")
         return regime
 
+    async def _dom_from_cmc(self) -> tuple:
+        """Source 1: CMC global metrics → (btc_d, usdt_d); btc_d reliable, usdt_d may be 0"""
+        btc_d = usdt_d = 0.0
+        try:
+            headers = {"X-CMC_PRO_API_KEY": config.CMC_API_KEY, "Accept": "application/json"}
+            async with self._http.get(CMC_GLOBAL_URL, headers=headers, timeout=aiohttp.ClientTimeout(total=6)) as resp:
+                if resp.status == 200:
+                    d = (await resp.json(loads=orjson.loads)).get("data", {})
+                    btc_d = float(d.get("btc_dominance", 0) or 0)
+                    # Try every known field name for USDT dominance
+                    for field in ["stablecoin_market_cap_dominance",
+                                  "stablecoin_volume_dominance",
+                                  "usdt_dominance",
+                                  "usdt_market_cap_dominance",
+                                  "stable_coin_dominance"]:
+                        v = d.get(field)
+                        if v and float(v) > 0:
+                            usdt_d = float(v)
+                            logger.info(f"USDT.D from CMC field '{field}': {usdt_d:.3f}%")
+                            break
+        except Exception as e:
+            logger.debug(f"CMC dominance fetch failed: {e}")
+        return btc_d, usdt_d
+
+    async def _dom_from_coingecko(self) -> tuple:
+        """Source 2: CoinGecko /global (free, no key, has exact USDT.D) → (btc_d, usdt_d)"""
+        try:
+            async with self._http.get(
+                CG_GLOBAL_URL,
+                timeout=aiohttp.ClientTimeout(total=6)
+            ) as resp:
+                if resp.status == 200:
+                    pct   = (await resp.json(loads=orjson.loads)).get("data", {}).get("market_cap_percentage", {})
+                    btc_d = float(pct.get("btc", 0) or 0)
+                    _usdt = float(pct.get("usdt", 0) or 0)
+                    # +0.35% for USDC/DAI offset
+                    return btc_d, (_usdt + 0.35 if _usdt > 0 else 0.0)
+        except Exception as e:
+            logger.debug(f"CoinGecko dominance fetch failed: {e}")
+        return 0.0, 0.0
+
+    async def _get_cmc_listing_mcaps(self, now: float) -> Optional[tuple]:
+        """
+        (total, usdt, btc) market caps of CMC's top-20 listings, or None on failure.
+        Market-cap shares move over minutes, so the paid call is cached CMC_LISTINGS_TTL.
+        """
+        cached = self._cmc_listings
+        if cached and now - cached[1] < CMC_LISTINGS_TTL:
+            return cached[0]
+        try:
+            url = (
+                "https://pro-api.coinmarketcap.com/v1/cryptocurrency/listings/latest"
+                "?limit=20&convert=USD&sort=market_cap"
+            )
+            headers = {"X-CMC_PRO_API_KEY": config.CMC_API_KEY, "Accept": "application/json"}
+            async with self._http.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=6)) as resp:
+                if resp.status != 200:
+                    return None
+                coins = (await resp.json(loads=orjson.loads)).get("data", [])
+        except Exception as e:
+            logger.debug(f"CMC listings dominance compute failed: {e}")
+            return None
+
+        mcap_arr = np.fromiter(
+            (float(c.get("quote", {}).get("USD", {}).get("market_cap", 0) or 0) for c in coins),
+            dtype=np.float64, count=len(coins),
+        )
+        sym_idx    = {c.get("symbol", ""): i for i, c in enumerate(coins)}
+        total_mcap = float(mcap_arr.sum())
+        usdt_mcap  = float(mcap_arr[sym_idx["USDT"]]) if "USDT" in sym_idx else 0.0
+        btc_mcap   = float(mcap_arr[sym_idx["BTC"]])  if "BTC"  in sym_idx else 0.0
+        if total_mcap <= 0:
+            return None
+        mcaps = (total_mcap, usdt_mcap, btc_mcap)
+        self._cmc_listings = (mcaps, now)
+        return mcaps
+
     def _build_regime(self, btc_d: float, usdt_d: float) -> dict:
         """
         Interpret BTC.D and USDT.D to determine market regime.
@@ -771,53 +1130,13 @@ class SignalEngine(commands.Cog):
         - risk_off     : USDT.D rising                  → market fear, prefer shorts
         - neutral      : mixed signals
         """
-        # ── USDT.D thresholds ────────────────────────────────────────────────
-        # Real-world calibration (Feb 2026 TradingView data):
-        #   8.29% = active fear / risk-off (confirmed from chart)
-        #   7.9%  = transition zone, caution
-        #   Below 6.5% = risk-on / greed
-        #   Below 5.5% = full altseason greed
-        usdt_extreme_fear = usdt_d > 8.0   # high fear — only shorts
-        usdt_fear         = usdt_d > 7.5   # moderate fear — caution on longs
-        usdt_neutral      = 6.5 <= usdt_d <= 7.5
-        usdt_greed        = 5.5 < usdt_d < 6.5
-        usdt_alt_greed    = usdt_d <= 5.5  # full altseason
-
-        # ── BTC.D thresholds ─────────────────────────────────────────────────
-        btc_d_high   = btc_d > 58.0    # BTC dominance phase
-        btc_d_low    = btc_d < 48.0    # altseason territory
-        btc_d_mid    = 48.0 <= btc_d <= 58.0
-
-        if usdt_extreme_fear:
-            regime      = "risk_off"
-            allow_long  = False
-            allow_short = True
-            bias = f"🔴 RISK-OFF — USDT.D {usdt_d:.2f}% (extreme fear), avoid longs"
-        elif usdt_fear:
-            regime      = "risk_off"
-            allow_long  = False
-            allow_short = True
-            bias = f"🟠 CAUTION — USDT.D {usdt_d:.2f}% (fear elevated), shorts preferred"
-        elif usdt_alt_greed and btc_d_low:
-            regime      = "risk_on_alt"
-            allow_long  = True
-            allow_short = False
-            bias = f"🟢 ALTSEASON — USDT.D {usdt_d:.2f}% low + BTC.D {btc_d:.1f}% falling"
-        elif (usdt_alt_greed or usdt_greed) and btc_d_high:
-            regime      = "risk_on_btc"
-            allow_long  = True
-            allow_short = True
-            bias = f"🟡 BTC SEASON — USDT.D {usdt_d:.2f}%, BTC.D {btc_d:.1f}% dominant"
-        elif usdt_neutral or usdt_greed:
-            regime      = "neutral"
-            allow_long  = True
-            allow_short = True
-            bias = f"⚪ NEUTRAL — USDT.D {usdt_d:.2f}%, mixed signals"
-        else:
-            regime      = "neutral"
-            allow_long  = True
-            allow_short = True
-            bias = f"⚪ NEUTRAL — USDT.D {usdt_d:.2f}%, BTC.D {btc_d:.1f}%"
+        # ── Bucket the two dominance readings, then look the regime up ─────────
+        usdt_b = usdt_bucket(usdt_d)
+        btc_b  = btc_bucket(btc_d)
+        regime, allow_long, allow_short, bias = REGIME_TABLE[usdt_b, btc_b]
+        bias = bias.format(usdt_d=usdt_d, btc_d=btc_d)
+        btc_d_high = btc_b == BTC_HIGH
+        btc_d_low  = btc_b == BTC_LOW
 
         return {
             "regime":       regime,
@@ -834,21 +1153,16 @@ class SignalEngine(commands.Cog):
 
     def _reset_quota_if_new_day(self, trade_type: str):
         """Reset daily counters at UTC midnight"""
-        import calendar
-        import datetime
         q   = self._quota[trade_type]
 
-        # calendar.timegm converts a UTC struct_time to a POSIX timestamp correctly
-        # regardless of the server's local timezone — unlike naive .timestamp()
-        utcnow = datetime.datetime.utcnow()
-        today_start = calendar.timegm(
-            utcnow.replace(hour=0, minute=0, second=0, microsecond=0).timetuple()
-        )
+        # POSIX time has no leap seconds, so UTC days are exact 86400s multiples
+        today_start = (int(time.time()) // 86400) * 86400
 
         if q["day_start"] < today_start:
             logger.info(f"Quota reset for {trade_type} (new UTC day)")
             q["day_start"]      = today_start
-            q["sent_today"]     = {"A+": 0, "B+": 0, "C+": 0}
+            q["sent_today"]     = dict.fromkeys(GRADES, 0)
+            q["total_sent"]     = 0
             q["hour_has_aplus"] = False
             q["day_has_bplus"]  = False
 
@@ -872,19 +1186,12 @@ class SignalEngine(commands.Cog):
           C+  -> 120min gap + no B+ all day
         """
         q          = self._quota[trade_type]
-        now        = time.time()
+        now        = time.monotonic()
         sent       = q["sent_today"]
         target     = q["daily_target"]
-        total_sent = sum(sent.values())
+        total_sent = q["total_sent"]
         secs_since = now - q["last_hour_sent"]
-
-        # Minimum gap per trade type per grade
-        GAP = {
-            "scalp": {"A+":     0, "B+": 55*60, "C+": 55*60},
-            "day":   {"A+": 60*60, "B+": 90*60, "C+": 90*60},
-            "swing": {"A+": 90*60, "B+":120*60, "C+":120*60},
-        }
-        min_gap = GAP.get(trade_type, {}).get(grade, 3600)
+        min_gap    = QUOTA_GAP.get(trade_type, {}).get(grade, 3600)
 
         # A+ scalp: never blocked
         if grade == "A+" and trade_type == "scalp":
@@ -930,7 +1237,8 @@ class SignalEngine(commands.Cog):
         """Update quota counters after a signal is successfully sent"""
         q = self._quota[trade_type]
         q["sent_today"][grade] = q["sent_today"].get(grade, 0) + 1
-        q["last_hour_sent"]    = time.time()
+        q["total_sent"]       += 1
+        q["last_hour_sent"]    = time.monotonic()
 
         if grade == "A+":
             q["hour_has_aplus"] = True
@@ -955,7 +1263,7 @@ class SignalEngine(commands.Cog):
         logger.info(f"Starting {trade_type} scan on {len(self._valid_symbols)} symbols")
 
         # Get BTC change (cached 5 min)
-        now = time.time()
+        now = time.monotonic()
         if now - self._btc_change_cache[1] > 300:
             btc_change = await self.fetcher.get_btc_change(interval, 4)
             self._btc_change_cache = (btc_change, now)
@@ -970,7 +1278,7 @@ class SignalEngine(commands.Cog):
         if trade_type == "scalp":
             n = dom_sig.get("candle_count", 0)
             bias = dom_sig.get("scalp_bias", "neutral")
-            reason = dom_sig.get("scalp_reason", "")
+            reason = self._scalp_reason()
             logger.info(
                 f"DOM candle signal ({n} candles): bias={bias} — {reason}"
             )
@@ -996,88 +1304,70 @@ class SignalEngine(commands.Cog):
                     dom["allow_short"] = False
                 # neutral = keep macro regime as-is
 
-        # Shuffle to avoid always checking same coins first
-        import random
-        symbols_to_scan = self._valid_symbols.copy()
-        random.shuffle(symbols_to_scan)
+        # Rotate the start point to avoid always checking same coins first
+        syms = self._valid_symbols
+        off  = self._scan_counter % len(syms)
+        self._scan_counter += 1
 
         # ── Phase 1: Collect all signals ──
-        raw_signals = []
-        for symbol in symbols_to_scan:
-            if symbol in self.active_trades:
-                continue
-            try:
-                signal = await self._analyze_symbol(symbol, trade_type, interval, kline_limit, btc_change, dom)
-                if signal:
-                    direction = signal.get("direction")
-
-                    # ── Dominance filter ─────────────────────────────────────
-                    # Block trades that go against the macro regime
-                    if direction == "LONG" and not dom["allow_long"]:
-                        logger.debug(f"Dominance blocked LONG {symbol} — {dom['regime']}")
-                        continue
-                    if direction == "SHORT" and not dom["allow_short"]:
-                        logger.debug(f"Dominance blocked SHORT {symbol} — {dom['regime']}")
-                        continue
+        # Analyses overlap their network waits; the semaphore keeps Binance load bounded
+        async def _analyze(symbol):
+            async with _scan_sem:
+                return await self._analyze_symbol(symbol, trade_type, interval, kline_limit, btc_change, dom)
 
-                    # ── BTC Correlation filter ───────────────────────────────
-                    btc_corr = signal.get("btc_corr", 0.5)
-                    dom_regime = dom["regime"]
+        symbols_to_scan = [s for s in syms[off:] + syms[:off] if s not in self.active_trades]
+        results = await asyncio.gather(*(_analyze(s) for s in symbols_to_scan), return_exceptions=True)
 
-                    # High BTC correlation (>0.8) + BTC falling = coin will also fall
-                    # Don't send LONG on high-corr coin when BTC trend is down
-                    if direction == "LONG" and btc_corr > 0.80 and btc_change < -0.5:
-                        logger.debug(f"BTC corr blocked: {symbol} LONG corr={btc_corr:.2f} BTC falling {btc_change:.1f}%")
+        flags = regime_flags(dom, dom_sig, trade_type)
+        raw_signals = []
+        for symbol, signal in zip(symbols_to_scan, results):
+            if isinstance(signal, Exception):
+                logger.warning(f"Analysis error {symbol}: {signal}", exc_info=signal)
+                continue
+            if not signal:
+                continue
+            if not self._passes_macro_filters(symbol, signal, dom, flags, btc_change):
+                continue
+            direction = signal.get("direction")
+            btc_corr  = signal.get("btc_corr", 0.5)
+
+            # In BTC season OR candle btc_long_only: block alt longs
+            if direction == "LONG":
+                is_alt = symbol not in MAJORS
+                candle_btc_only = flags & BTC_ONLY_CANDLE
+                macro_btc_only  = flags & BTC_SEASON and btc_corr > 0.75
+
+                if is_alt and (candle_btc_only or macro_btc_only):
+                    if signal.get("grade") == "A+":
+                        signal["grade"] = "B+"
+                        logger.debug(f"BTC dominance: demoted {symbol} LONG A+→B+")
+                    elif signal.get("grade") == "B+" and candle_btc_only:
+                        logger.debug(f"Candle btc_long_only: blocked {symbol} LONG B+")
                         continue
 
-                    # Inverse correlation SHORT: if coin is inverse to BTC and BTC rising, don't short
-                    if direction == "SHORT" and btc_corr < -0.5 and btc_change > 0.5:
-                        logger.debug(f"BTC inv-corr blocked: {symbol} SHORT corr={btc_corr:.2f} BTC rising {btc_change:.1f}%")
-                        continue
+            # Low/negative correlation in altseason = prioritize (decorrelated alts run harder)
+            if flags & ALTSEASON and direction == "LONG" and btc_corr < 0.4:
+                signal["score"] = min(100, signal.get("score", 0) + 5)
+                logger.debug(f"Altseason decorrelated boost: {symbol} corr={btc_corr:.2f}")
 
-                    # In BTC season OR candle btc_long_only: block alt longs
-                    if direction == "LONG":
-                        base = symbol.replace("USDT","")
-                        is_alt = base not in ["BTC","ETH"]
-                        candle_btc_only = dom_sig.get("scalp_bias") == "btc_long_only" and trade_type == "scalp"
-                        macro_btc_only  = dom["regime"] == "risk_on_btc" and btc_corr > 0.75
-
-                        if is_alt and (candle_btc_only or macro_btc_only):
-                            if signal.get("grade") == "A+":
-                                signal["grade"] = "B+"
-                                logger.debug(f"BTC dominance: demoted {symbol} LONG A+→B+")
-                            elif signal.get("grade") == "B+" and candle_btc_only:
-                                logger.debug(f"Candle btc_long_only: blocked {symbol} LONG B+")
-                                continue
-
-                    # Low/negative correlation in altseason = prioritize (decorrelated alts run harder)
-                    if dom["regime"] == "risk_on_alt" and direction == "LONG" and btc_corr < 0.4:
-                        signal["score"] = min(100, signal.get("score", 0) + 5)
-                        logger.debug(f"Altseason decorrelated boost: {symbol} corr={btc_corr:.2f}")
-
-                    # Attach dominance context to signal
-                    signal["market_regime"] = dom["regime"]
-                    signal["btc_d"]   = dom["btc_d"]
-                    signal["usdt_d"]  = dom["usdt_d"]
-                    signal["dom_bias"] = dom["bias"]
-                    raw_signals.append(signal)
-                await asyncio.sleep(0.1)
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.warning(f"Analysis error {symbol}: {e}", exc_info=True)
-                await asyncio.sleep(0.2)
+            # Attach dominance context to signal
+            signal["market_regime"] = dom["regime"]
+            signal["btc_d"]   = dom["btc_d"]
+            signal["usdt_d"]  = dom["usdt_d"]
+            signal["dom_bias"] = dom["bias"]
+            raw_signals.append(signal)
 
         # ── Phase 2: Sort A+ > B+ > C+ by score within each grade ─────────
         sorted_signals = self.ml.sort_signals_by_priority(raw_signals)
 
         # ── Phase 3: Quota-aware sending ─────────────────────────────────────
         signals_sent = 0
-        scan_counts  = {"A+": 0, "B+": 0, "C+": 0}
+        scan_counts  = dict.fromkeys(GRADES, 0)
         ml_trained   = len(self.ml.trade_history) >= 50
 
         q = self._quota[trade_type]
         self._reset_quota_if_new_day(trade_type)
+        guilds = db.get_all_guilds() if sorted_signals else []
 
         for signal in sorted_signals:
             try:
@@ -1104,11 +1394,10 @@ class SignalEngine(commands.Cog):
                             logger.debug(f"ML filtered {signal['symbol']} {grade} — prob {ml_prob:.2f}")
                             continue
 
-                await self._send_signal(signal)
+                await self._send_signal(signal, guilds)
                 self._record_quota_send(trade_type, grade)
                 scan_counts[grade] = scan_counts.get(grade, 0) + 1
                 signals_sent += 1
-                await asyncio.sleep(0.5)
 
             except asyncio.CancelledError:
                 break
@@ -1116,7 +1405,7 @@ class SignalEngine(commands.Cog):
                 logger.warning(f"Error sending {signal.get('symbol')}: {e}", exc_info=True)
 
         q = self._quota[trade_type]
-        total_today = sum(q["sent_today"].values())
+        total_today = q["total_sent"]
         logger.info(
             f"{trade_type} scan complete. "
             f"Raw: {len(raw_signals)} → Sent: {signals_sent} "
@@ -1125,29 +1414,44 @@ class SignalEngine(commands.Cog):
             f"(A+:{q['sent_today']['A+']} B+:{q['sent_today']['B+']} C+:{q['sent_today']['C+']})"
         )
 
+    @staticmethod
+    def _passes_macro_filters(symbol: str, signal: dict, dom: dict, flags: int, btc_change: float) -> bool:
+        """Cheap dominance / BTC-correlation hard blocks, checked before any send or ML call"""
+        direction = signal.get("direction")
+
+        # ── Dominance filter ─────────────────────────────────────
+        # Block trades that go against the macro regime
+        if direction == "LONG" and not flags & ALLOW_LONG:
+            logger.debug("Dominance blocked LONG %s — %s", symbol, dom["regime"])
+            return False
+        if direction == "SHORT" and not flags & ALLOW_SHORT:
+            logger.debug("Dominance blocked SHORT %s — %s", symbol, dom["regime"])
+            return False
+
+        # ── BTC Correlation filter ───────────────────────────────
+        btc_corr = signal.get("btc_corr", 0.5)
+
+        # High BTC correlation (>0.8) + BTC falling = coin will also fall
+        # Don't send LONG on high-corr coin when BTC trend is down
+        if direction == "LONG" and btc_corr > 0.80 and btc_change < -0.5:
+            logger.debug(f"BTC corr blocked: {symbol} LONG corr={btc_corr:.2f} BTC falling {btc_change:.1f}%")
+            return False
+
+        # Inverse correlation SHORT: if coin is inverse to BTC and BTC rising, don't short
+        if direction == "SHORT" and btc_corr < -0.5 and btc_change > 0.5:
+            logger.debug(f"BTC inv-corr blocked: {symbol} SHORT corr={btc_corr:.2f} BTC rising {btc_change:.1f}%")
+            return False
+
+        return True
+
     async def _analyze_symbol(self, symbol: str, trade_type: str, interval: str, limit: int, btc_change: float, dom: dict = None) -> Optional[dict]:
         """Full analysis pipeline for one symbol"""
-        # Fetch data in parallel
-        klines_task    = self.fetcher.get_klines(symbol, interval, limit)
-        oi_task        = self.fetcher.get_open_interest(symbol)
-        funding_task   = self.fetcher.get_funding_rate(symbol)
-        ob_task        = self.fetcher.get_orderbook_imbalance(symbol, 20)
-        taker_task     = self.fetcher.get_taker_buy_sell_ratio(symbol, "5m", 10)
-        ticker_task    = self.fetcher.get_ticker_24h(symbol)
-
-        results = await asyncio.gather(
-            klines_task, oi_task, funding_task, ob_task, taker_task, ticker_task,
+        # Cheap liquidity gate first — most symbols fail it, so skip the heavy calls for them
+        ticker, oi_data = await asyncio.gather(
+            self.fetcher.get_ticker_24h(symbol),
+            self.fetcher.get_open_interest(symbol),
             return_exceptions=True
         )
-
-        df, oi_data, funding_rate, ob_imbalance, taker_df, ticker = results
-
-        # Validate
-        if isinstance(df, Exception) or df is None or (hasattr(df, 'empty') and df.empty):
-            return None
-        if isinstance(funding_rate, Exception): funding_rate = 0.0
-        if isinstance(ob_imbalance, Exception): ob_imbalance = 0.0
-        if isinstance(taker_df, Exception):     taker_df = None
         if isinstance(ticker, Exception):       ticker = {}
         if isinstance(oi_data, Exception):      oi_data = {}
 
@@ -1166,9 +1470,28 @@ class SignalEngine(commands.Cog):
             except:
                 pass
 
+        # Liquid enough — fetch the rest in parallel
+        klines_task    = self.fetcher.get_klines(symbol, interval, limit)
+        funding_task   = self.fetcher.get_funding_rate(symbol)
+        ob_task        = self.fetcher.get_orderbook_imbalance(symbol, 20)
+        taker_task     = self.fetcher.get_taker_buy_sell_ratio(symbol, "5m", 10)
+
+        df, funding_rate, ob_imbalance, taker_df = await asyncio.gather(
+            klines_task, funding_task, ob_task, taker_task,
+            return_exceptions=True
+        )
+
+        # Validate
+        if isinstance(df, Exception) or df is None or (hasattr(df, 'empty') and df.empty):
+            return None
+        if isinstance(funding_rate, Exception): funding_rate = 0.0
+        if isinstance(ob_imbalance, Exception): ob_imbalance = 0.0
+        if isinstance(taker_df, Exception):     taker_df = None
+
         # Coin % change
-        if len(df) >= 4:
-            coin_change = ((float(df["close"].iloc[-1]) - float(df["close"].iloc[-4])) / float(df["close"].iloc[-4])) * 100
+        close_arr = df["close"].to_numpy(dtype="float64", copy=False)
+        if len(close_arr) >= 4:
+            coin_change = float((close_arr[-1] - close_arr[-4]) / close_arr[-4] * 100.0)
         else:
             coin_change = 0.0
 
@@ -1176,12 +1499,12 @@ class SignalEngine(commands.Cog):
         taker_ls = 1.0
         if taker_df is not None and not taker_df.empty and "buySellRatio" in taker_df.columns:
             try:
-                taker_ls = float(taker_df["buySellRatio"].iloc[-1])
+                taker_ls = float(taker_df["buySellRatio"].to_numpy()[-1])
             except:
                 pass
 
         # Indicators
-        indicators = calculate_all_indicators(df)
+        indicators = await self._run_in_pool("indicator_pool", calculate_all_indicators, df)
         if not indicators:
             return None
 
@@ -1200,7 +1523,7 @@ class SignalEngine(commands.Cog):
 
         # Score signal
         # BTC correlation — tells us how closely this coin follows BTC
-        btc_corr = await self._get_btc_correlation(symbol, interval)
+        btc_corr = await self._get_btc_correlation(symbol, interval, df)
 
         signal = self.scorer.score_signal(
             symbol=symbol,
@@ -1229,15 +1552,15 @@ class SignalEngine(commands.Cog):
 
     # ─── Signal Sending ───────────────────────────────────────────────────────
 
-    async def _send_signal(self, signal: dict):
-        """Send signal to ALL configured guilds, with AI analysis"""
-        import db
+    async def _send_signal(self, signal: dict, guilds: Optional[list] = None):
+        """Send signal to ALL configured guilds, with AI analysis. Pass guilds to reuse a scan's lookup."""
         trade_type = signal["trade_type"]
-        channel_key = {"scalp": "scalp_channel_id", "day": "day_channel_id", "swing": "swing_channel_id"}.get(trade_type)
+        channel_key = CHANNEL_KEYS.get(trade_type)
         if not channel_key:
             return
 
-        guilds = db.get_all_guilds()
+        if guilds is None:
+            guilds = db.get_all_guilds()
         if not guilds:
             logger.warning(f"No guilds configured for {trade_type}")
             return
@@ -1254,29 +1577,29 @@ class SignalEngine(commands.Cog):
         symbol    = signal["symbol"]
         direction = signal["direction"]
         grade     = signal["grade"]
+        wyckoff   = signal.get("wyckoff_phase", "none")
+        dom_bias  = signal.get("dom_bias", "")
         entry     = signal.get("entry", 0)
         sl        = signal.get("sl", 0)
-        tps       = signal.get("tps", [])
         score     = signal.get("score", 0)
         leverage  = signal.get("leverage", 5)
         rsi14     = signal.get("rsi14", 0)
         vol_ratio = signal.get("vol_ratio", 0)
         funding   = signal.get("funding_rate", 0)
+        btc_d     = signal.get("btc_d", 0)
+        usdt_d    = signal.get("usdt_d", 0)
+        btc_corr  = signal.get("btc_corr", None)
+        tps       = signal.get("tps", [])
         confluences = signal.get("confluences", [])
-        wyckoff   = signal.get("wyckoff_phase", "none")
         pa        = signal.get("pa_signals", [])
         gc        = signal.get("grade_criteria", {})
 
         dir_emoji  = "🟢" if direction == "LONG" else "🔴"
-        grade_emoji = {"A+": "🏆", "B+": "🥈", "C+": "🥉"}.get(grade, "")
+        grade_emoji = GRADE_EMOJI.get(grade, "")
         color = 0x00C853 if direction == "LONG" else 0xFF1744
 
         # Grade description
-        grade_desc = {
-            "A+": "🎯 Sniper shot — take it without hesitation",
-            "B+": "✅ Good setup — most criteria met",
-            "C+": "⚠️ Directional bias — partial setup",
-        }.get(grade, "")
+        grade_desc = GRADE_DESC.get(grade, "")
 
         embed = discord.Embed(
             title=f"{dir_emoji} {grade_emoji} {grade} {direction} — {symbol}",
@@ -1285,15 +1608,8 @@ class SignalEngine(commands.Cog):
         )
 
         # Price levels
-        def fp(p):
-            if not p: return "—"
-            if p >= 1000:  return f"{p:,.2f}"
-            if p >= 1:     return f"{p:.4f}"
-            if p >= 0.01:  return f"{p:.5f}"
-            return f"{p:.8f}"
-
-        embed.add_field(name="📍 Entry",     value=f"`{fp(entry)}`",    inline=True)
-        embed.add_field(name="🛑 Stop Loss", value=f"`{fp(sl)}`",       inline=True)
+        embed.add_field(name="📍 Entry",     value=f"`{fmt_price(entry)}`",    inline=True)
+        embed.add_field(name="🛑 Stop Loss", value=f"`{fmt_price(sl)}`",       inline=True)
         embed.add_field(name="⚡ Leverage",  value=f"`{leverage}×`",    inline=True)
 
         if entry and sl:
@@ -1307,7 +1623,7 @@ class SignalEngine(commands.Cog):
             tp_lines = []
             for i, tp in enumerate(tps):
                 rr = abs(tp - entry) / abs(entry - sl) if (entry and sl and entry != sl) else 0
-                tp_lines.append(f"TP{i+1}: `{fp(tp)}` (R:R {rr:.1f})")
+                tp_lines.append(f"TP{i+1}: `{fmt_price(tp)}` (R:R {rr:.1f})")
             embed.add_field(name="🎯 Take Profits", value="\n".join(tp_lines), inline=False)
 
         # Grade criteria checklist
@@ -1325,21 +1641,15 @@ class SignalEngine(commands.Cog):
         # Wyckoff + PA
         theory_lines = []
         if wyckoff != "none":
-            wlabels = {
-                "accumulation_spring": "📦 Wyckoff: Accumulation Spring",
-                "markup_SOS":          "📈 Wyckoff: Markup — Sign of Strength",
-                "distribution_UTAD":   "📤 Wyckoff: Distribution UTAD",
-                "markdown_SOW":        "📉 Wyckoff: Markdown — Sign of Weakness",
-            }
-            theory_lines.append(wlabels.get(wyckoff, wyckoff))
+            theory_lines.append(WYCKOFF_LABELS.get(wyckoff, wyckoff))
         for p in pa[:2]:
             theory_lines.append(f"🔍 PA: {p}")
         if theory_lines:
             embed.add_field(name="🧠 Theory", value="\n".join(theory_lines), inline=False)
 
         # Confluences
-        clean_conf = [c.replace("✅ ", "").replace("✅", "").strip()
-                      for c in confluences if not c.startswith("⚠️") and not c.startswith("✅ Wyckoff") and not c.startswith("✅ PA:")][:6]
+        clean_conf = [c.removeprefix("✅").strip()
+                      for c in confluences if not c.startswith(CONF_SKIP_PREFIXES)][:6]
         if clean_conf:
             embed.add_field(name="🔗 Confluences", value="\n".join(f"• {c}" for c in clean_conf), inline=False)
 
@@ -1356,10 +1666,6 @@ class SignalEngine(commands.Cog):
             embed.add_field(name="🤖 AI Analysis", value=short_ai, inline=False)
 
         # Market regime + BTC correlation
-        btc_d    = signal.get("btc_d", 0)
-        usdt_d   = signal.get("usdt_d", 0)
-        dom_bias = signal.get("dom_bias", "")
-        btc_corr = signal.get("btc_corr", None)
         dom_trend = self._dom_trend
 
         if btc_d > 0:
@@ -1398,18 +1704,11 @@ class SignalEngine(commands.Cog):
                 uv  = ds.get("usdt_velocity", 0)
                 bv  = ds.get("btc_velocity",  0)
                 ua  = ds.get("usdt_accel",    0)
-                bias_icons = {
-                    "long_ok":      "🟢",
-                    "short_ok":     "🔴",
-                    "btc_long_only":"🟡",
-                    "neutral":      "⚪",
-                    "blocked":      "⛔",
-                }
-                icon = bias_icons.get(ds.get("scalp_bias","neutral"), "⚪")
+                icon = SCALP_BIAS_ICONS.get(ds.get("scalp_bias","neutral"), "⚪")
                 embed.add_field(
                     name=f"🕯️ DOM Candle Signal ({n} candles)",
                     value=(
-                        f"{icon} {ds.get('scalp_reason','')}\n"
+                        f"{icon} {self._scalp_reason()}\n"
                         f"USDT.D vel: `{uv:+.4f}%/min`  accel: `{ua:+.4f}`\n"
                         f"BTC.D  vel: `{bv:+.4f}%/min`"
                     ),
@@ -1418,35 +1717,92 @@ class SignalEngine(commands.Cog):
 
         embed.set_footer(text=f"{symbol} • {trade_type.upper()} • Not financial advice")
 
-        # Store per-guild message refs for reply threading
-        guild_messages = []
+        await self._send_bucket.acquire()
 
-        for guild_cfg in guilds:
-            channel_id = guild_cfg[channel_key]
-            if not channel_id:
-                continue
-            channel = self.bot.get_channel(channel_id)
-            if not channel:
-                continue
+        # The same embed goes to every guild; channels are separate rate-limit buckets, so post concurrently
+        async def _post(guild_cfg, channel):
             try:
                 msg = await channel.send(embed=embed)
-                guild_messages.append((channel_id, msg.id))
                 logger.info(f"Signal sent to guild '{guild_cfg['guild_name']}': {symbol} {direction} {trade_type} Grade:{grade}")
+                return msg
             except discord.HTTPException as e:
                 if e.code in (50001, 50013):  # Missing Access / Missing Permissions
                     logger.debug(f"Signal skipped (no permission) guild={guild_cfg['guild_id']}")
                 else:
                     logger.error(f"Failed to send signal to guild {guild_cfg['guild_id']}: {e}")
+                return None
+            except Exception as e:
+                # Anything else (timeouts, dropped connections) must not sink the other guilds' refs
+                logger.error(f"Failed to send signal to guild {guild_cfg['guild_id']}: {e!r}")
+                return None
+
+        targets = []
+        for guild_cfg in guilds:
+            channel_id = guild_cfg[channel_key]
+            if not channel_id:
+                continue
+            channel = self.bot.get_channel(channel_id)
+            if channel:
+                targets.append((guild_cfg, channel))
+
+        msgs = await asyncio.gather(*(_post(cfg, ch) for cfg, ch in targets))
+
+        # Store per-guild message refs for reply threading
+        guild_messages = []
+        guild_ids      = []
+        for (guild_cfg, channel), msg in zip(targets, msgs):
+            if msg:
+                guild_messages.append((channel.id, msg.id))
+                guild_ids.append(guild_cfg["guild_id"])
 
         if guild_messages:
             signal["guild_messages"] = guild_messages  # [(channel_id, msg_id), ...]
             signal["channel_id"]     = guild_messages[0][0]  # keep for compat
             signal["message_id"]     = guild_messages[0][1]
             signal["tps_hit"]        = 0
+            signal["guild_ids"]      = guild_ids
             self.active_trades[symbol] = signal
+            for gid in guild_ids:
+                self.trades_by_guild[gid].add(symbol)
+
+    def _close_trade(self, symbol: str):
+        """Drop a closed trade from active_trades and the per-guild index"""
+        trade = self.active_trades.pop(symbol, None)
+        if not trade:
+            return
+        for gid in trade.get("guild_ids", []):
+            syms = self.trades_by_guild.get(gid)
+            if syms is not None:
+                syms.discard(symbol)
+                if not syms:
+                    del self.trades_by_guild[gid]
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+        self.trades_by_guild.pop(guild.id, None)
 
     # ─── TP/SL Handlers ──────────────────────────────────────────────────────
 
+    async def _reply_in_guilds(self, trade: dict, embed: discord.Embed, what: str) -> dict:
+        """
+        Reply with embed to the trade's latest message in every guild, concurrently.
+        Returns {channel_id: sent_message_id} for the replies that went through.
+        """
+        async def _reply(channel, channel_id, msg_id):
+            try:
+                ref = discord.MessageReference(message_id=msg_id, channel_id=channel_id, fail_if_not_exists=False)
+                return channel_id, (await channel.send(embed=embed, reference=ref)).id
+            except Exception as e:
+                logger.error(f"{what} message error in channel {channel_id}: {e}")
+                return channel_id, None
+
+        replies = []
+        for channel_id, msg_id in trade.get("guild_messages", [(trade.get("channel_id"), trade.get("message_id"))]):
+            channel = self.bot.get_channel(channel_id)
+            if channel:
+                replies.append(_reply(channel, channel_id, msg_id))
+        return {cid: mid for cid, mid in await asyncio.gather(*replies) if mid}
+
     async def _handle_tp_hit(self, symbol: str, trade: dict, tp_num: int, tp_price: float):
         tps        = trade.get("tps", [])
         total_tps  = len(tps)
@@ -1493,18 +1849,10 @@ class SignalEngine(commands.Cog):
             remaining = tps[tps_hit:]
             embed.set_footer(text=f"Next target: TP{tps_hit+1} @ {remaining[0]} | SL: {sl}")
 
-        # Send embed as reply in every guild
-        for channel_id, msg_id in trade.get("guild_messages", [(trade.get("channel_id"), trade.get("message_id"))]):
-            channel = self.bot.get_channel(channel_id)
-            if not channel:
-                continue
-            try:
-                ref  = discord.MessageReference(message_id=msg_id, channel_id=channel_id, fail_if_not_exists=False)
-                sent = await channel.send(embed=embed, reference=ref)
-                msgs = trade.get("guild_messages", [])
-                trade["guild_messages"] = [(cid, sent.id if cid == channel_id else mid) for cid, mid in msgs]
-            except Exception as e:
-                logger.error(f"TP hit message error in channel {channel_id}: {e}")
+        # Send embed as reply in every guild; the next update threads onto this one
+        sent_ids = await self._reply_in_guilds(trade, embed, "TP hit")
+        if sent_ids and "guild_messages" in trade:
+            trade["guild_messages"] = [(cid, sent_ids.get(cid, mid)) for cid, mid in trade["guild_messages"]]
 
         logger.info(f"TP{tp_num}/{total_tps} hit for {symbol} at {tp_price} (+{pnl_str})")
 
@@ -1552,15 +1900,7 @@ class SignalEngine(commands.Cog):
         embed.set_footer(text="Trade closed • ML engine has recorded this outcome")
 
         # Reply to original signal in every guild
-        for channel_id, msg_id in trade.get("guild_messages", [(trade.get("channel_id"), trade.get("message_id"))]):
-            channel = self.bot.get_channel(channel_id)
-            if not channel:
-                continue
-            try:
-                ref  = discord.MessageReference(message_id=msg_id, channel_id=channel_id, fail_if_not_exists=False)
-                await channel.send(embed=embed, reference=ref)
-            except Exception as e:
-                logger.error(f"SL hit message error in channel {channel_id}: {e}")
+        await self._reply_in_guilds(trade, embed, "SL hit")
 
         self.ml.record_trade(
             trade, trade.get("indicators", {}),
@@ -1568,8 +1908,7 @@ class SignalEngine(commands.Cog):
             trade.get("ob_imbalance", 0),
             "loss"
         )
-        if symbol in self.active_trades:
-            del self.active_trades[symbol]
+        self._close_trade(symbol)
         logger.info(f"SL hit for {symbol} at {price} ({loss_str})")
 
     # Commands are handled by cogs/admin.py to avoid duplicate registration
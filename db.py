@@ -5,6 +5,7 @@ Replaces .env channel IDs with per-guild database records
 import sqlite3
 import logging
 import os
+import threading
 from typing import Optional
 
 logger = logging.getLogger("DB")
@@ -12,16 +13,51 @@ logger = logging.getLogger("DB")
 DB_PATH = "data/guilds.db"
 
 
+_conn: Optional[sqlite3.Connection] = None
+# Serialises access to the shared connection — callers run on the event loop and in to_thread workers
+_lock = threading.RLock()
+
+# In-memory mirror of guild_config — reads are served from here, every write below updates it
+_guilds: dict = {}        # {guild_id: sqlite3.Row}
+_guilds_loaded = False
+
+
 def get_conn() -> sqlite3.Connection:
-    os.makedirs("data", exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Process-wide connection, opened on first use. Hold _lock while using it."""
+    global _conn
+    with _lock:
+        if _conn is None:
+            os.makedirs("data", exist_ok=True)
+            conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            _conn = conn
+        return _conn
+
+
+def _load_guilds(conn: sqlite3.Connection):
+    """(Re)load the whole guild_config mirror. Call with _lock held."""
+    global _guilds, _guilds_loaded
+    _guilds = {row["guild_id"]: row for row in conn.execute("SELECT * FROM guild_config")}
+    _guilds_loaded = True
+
+
+def _refresh_guild(conn: sqlite3.Connection, guild_id: int):
+    """Re-read one guild's row into the mirror (picks up defaults/timestamps). Call with _lock held."""
+    if not _guilds_loaded:
+        return _load_guilds(conn)
+    row = conn.execute("SELECT * FROM guild_config WHERE guild_id = ?", (guild_id,)).fetchone()
+    if row is None:
+        _guilds.pop(guild_id, None)
+    else:
+        _guilds[guild_id] = row
 
 
 def init_db():
     """Create tables if they don't exist"""
-    with get_conn() as conn:
+    with _lock, get_conn() as conn:
         conn.execute("""
             CREATE TABLE IF NOT EXISTS guild_config (
                 guild_id              INTEGER PRIMARY KEY,
@@ -36,25 +72,39 @@ def init_db():
             )
         """)
         conn.commit()
+        _load_guilds(conn)
     logger.info("Database initialized")
 
 
 def upsert_guild(guild_id: int, guild_name: str):
     """Register a guild if not already in DB"""
-    with get_conn() as conn:
+    with _lock, get_conn() as conn:
         conn.execute("""
             INSERT INTO guild_config (guild_id, guild_name)
             VALUES (?, ?)
             ON CONFLICT(guild_id) DO UPDATE SET guild_name=excluded.guild_name
         """, (guild_id, guild_name))
         conn.commit()
+        _refresh_guild(conn, guild_id)
+
+
+def upsert_guilds_bulk(rows: list):
+    """Register many guilds at once — rows of (guild_id, guild_name), one transaction"""
+    with _lock, get_conn() as conn:
+        conn.executemany("""
+            INSERT INTO guild_config (guild_id, guild_name)
+            VALUES (?, ?)
+            ON CONFLICT(guild_id) DO UPDATE SET guild_name=excluded.guild_name
+        """, rows)
+        conn.commit()
+        _load_guilds(conn)
 
 
 def save_guild_channels(guild_id: int, guild_name: str,
                         scalp_id: int, day_id: int, swing_id: int,
                         liq_id: int, log_id: int):
     """Save or update channel IDs for a guild"""
-    with get_conn() as conn:
+    with _lock, get_conn() as conn:
         conn.execute("""
             INSERT INTO guild_config
                 (guild_id, guild_name, scalp_channel_id, day_channel_id,
@@ -70,27 +120,29 @@ def save_guild_channels(guild_id: int, guild_name: str,
                 updated_at=CURRENT_TIMESTAMP
         """, (guild_id, guild_name, scalp_id, day_id, swing_id, liq_id, log_id))
         conn.commit()
+        _refresh_guild(conn, guild_id)
 
 
 def get_guild_config(guild_id: int) -> Optional[sqlite3.Row]:
-    """Get channel config for a guild. Returns None if not set up."""
-    with get_conn() as conn:
-        row = conn.execute(
-            "SELECT * FROM guild_config WHERE guild_id = ?", (guild_id,)
-        ).fetchone()
-    return row
+    """Get channel config for a guild (from memory). Returns None if not set up."""
+    with _lock:
+        if not _guilds_loaded:
+            _load_guilds(get_conn())
+        return _guilds.get(guild_id)
 
 
 def get_all_guilds() -> list:
-    """Get all configured guilds"""
-    with get_conn() as conn:
-        rows = conn.execute("SELECT * FROM guild_config").fetchall()
-    return rows
+    """Get all configured guilds (from memory)"""
+    with _lock:
+        if not _guilds_loaded:
+            _load_guilds(get_conn())
+        return list(_guilds.values())
 
 
 def delete_guild(guild_id: int):
     """Remove guild config (called when bot is kicked)"""
-    with get_conn() as conn:
+    with _lock, get_conn() as conn:
         conn.execute("DELETE FROM guild_config WHERE guild_id = ?", (guild_id,))
         conn.commit()
+        _guilds.pop(guild_id, None)
     logger.info(f"Removed guild {guild_id} from database")
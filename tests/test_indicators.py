@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+
+from utils.indicators import _ema_np, calculate_all_indicators
+
+
+def test_ema_np_matches_pandas_on_flat_series():
+    for value in (0.1, 1.2345, 67123.7, 3e-5):
+        x = np.full(300, value)
+        for span in (9, 12, 26, 200):
+            expected = pd.Series(x).ewm(span=span, adjust=False).mean().to_numpy()
+            np.testing.assert_array_equal(_ema_np(x, span), expected)
+
+
+def test_flat_candles_have_no_macd_divergence():
+    price = 0.1234
+    df = pd.DataFrame({
+        "open":   np.full(250, price),
+        "high":   np.full(250, price),
+        "low":    np.full(250, price),
+        "close":  np.full(250, price),
+        "volume": np.full(250, 1000.0),
+    })
+    ind = calculate_all_indicators(df)
+    assert ind["macd_hist"] == 0
+    assert ind["macd_hist_prev"] == 0
+    assert ind["divergence_macd"] == "none"
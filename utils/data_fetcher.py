@@ -7,6 +7,7 @@ import asyncio
 import aiohttp
 import logging
 import time
+import orjson
 from typing import Optional
 import pandas as pd
 import numpy as np
@@ -17,19 +18,31 @@ CMC_BASE   = "https://pro-api.coinmarketcap.com/v1"
 BINANCE_BASE = "https://fapi.binance.com"
 BINANCE_SPOT = "https://api.binance.com"
 
+# Binance Futures allows 2400 request weight per minute per IP. Past the soft limit we
+# hold new requests until the next minute window instead of running into 429s, and a
+# 429/418 pauses everything for Retry-After — ignoring those escalates to an IP ban.
+BINANCE_WEIGHT_LIMIT      = 2400
+BINANCE_WEIGHT_SOFT_LIMIT = 2000
+BINANCE_DEFAULT_BACKOFF   = 60  # seconds, when a 429/418 comes without Retry-After
+
 
 class DataFetcher:
-    def __init__(self, cmc_api_key: str, binance_key: str = "", binance_secret: str = ""):
+    def __init__(self, cmc_api_key: str, binance_key: str = "", binance_secret: str = "",
+                 session: Optional[aiohttp.ClientSession] = None):
         self.cmc_api_key = cmc_api_key
         self.binance_key = binance_key
-        self._session: Optional[aiohttp.ClientSession] = None
+        # A passed-in session (the bot's pooled one) is borrowed — close() leaves it open
+        self._session: Optional[aiohttp.ClientSession] = session
+        self._owns_session = session is None
         self._top_coins_cache = []
         self._top_coins_ts = 0
         self._futures_symbols_cache = set()
         self._futures_symbols_ts = 0
+        self._binance_paused_until = 0.0  # monotonic; shared by every Binance call
 
     async def _get_session(self) -> aiohttp.ClientSession:
         if self._session is None or self._session.closed:
+            self._owns_session = True
             timeout = aiohttp.ClientTimeout(total=30)
             # Use ThreadedResolver to avoid aiodns DNS failures on Windows
             connector = aiohttp.TCPConnector(resolver=aiohttp.resolver.ThreadedResolver())
@@ -37,9 +50,36 @@ class DataFetcher:
         return self._session
 
     async def close(self):
-        if self._session and not self._session.closed:
+        if self._owns_session and self._session and not self._session.closed:
             await self._session.close()
 
+    async def _binance_get(self, path: str, params: Optional[dict] = None):
+        """GET a Binance Futures endpoint, honouring the IP weight budget. Returns parsed JSON, or None on a non-200."""
+        delay = self._binance_paused_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        session = await self._get_session()
+        async with session.get(f"{BINANCE_BASE}{path}", params=params) as resp:
+            if resp.status in (429, 418):  # 418 = IP already banned for ignoring 429s
+                try:
+                    backoff = int(resp.headers.get("Retry-After", BINANCE_DEFAULT_BACKOFF))
+                except ValueError:
+                    backoff = BINANCE_DEFAULT_BACKOFF
+                self._pause_binance(backoff)
+                logger.warning(f"Binance {resp.status} on {path}: pausing requests for {backoff}s")
+                return None
+            used = resp.headers.get("X-MBX-USED-WEIGHT-1M")
+            if used and used.isdigit() and int(used) >= BINANCE_WEIGHT_SOFT_LIMIT:
+                # The weight window resets on the wall-clock minute
+                self._pause_binance(60 - time.time() % 60)
+                logger.warning(f"Binance weight {used}/{BINANCE_WEIGHT_LIMIT}: holding requests until the next minute")
+            if resp.status != 200:
+                return None
+            return await resp.json(loads=orjson.loads)
+
+    def _pause_binance(self, seconds: float):
+        self._binance_paused_until = max(self._binance_paused_until, time.monotonic() + seconds)
+
     # ─── CMC Top Coins ──────────────────────────────────────────────────────
     async def get_top_coins(self, limit: int = 1000, refresh_hours: int = 6) -> list[str]:
         """Returns list of top N symbols by market cap"""
@@ -59,7 +99,7 @@ class DataFetcher:
         try:
             async with session.get(url, params=params, headers=headers) as resp:
                 if resp.status == 200:
-                    data = await resp.json()
+                    data = await resp.json(loads=orjson.loads)
                     symbols = [coin["symbol"] for coin in data.get("data", [])]
                     self._top_coins_cache = symbols
                     self._top_coins_ts = now
@@ -78,21 +118,19 @@ class DataFetcher:
         if self._futures_symbols_cache and (now - self._futures_symbols_ts) < 3600:
             return self._futures_symbols_cache
 
-        session = await self._get_session()
         try:
-            async with session.get(f"{BINANCE_BASE}/fapi/v1/exchangeInfo") as resp:
-                if resp.status == 200:
-                    data = await resp.json()
-                    syms = {
-                        s["symbol"]
-                        for s in data.get("symbols", [])
-                        if s.get("quoteAsset") == "USDT"
-                        and s.get("contractType") == "PERPETUAL"
-                        and s.get("status") == "TRADING"
-                    }
-                    self._futures_symbols_cache = syms
-                    self._futures_symbols_ts = now
-                    return syms
+            data = await self._binance_get("/fapi/v1/exchangeInfo")
+            if data is not None:
+                syms = {
+                    s["symbol"]
+                    for s in data.get("symbols", [])
+                    if s.get("quoteAsset") == "USDT"
+                    and s.get("contractType") == "PERPETUAL"
+                    and s.get("status") == "TRADING"
+                }
+                self._futures_symbols_cache = syms
+                self._futures_symbols_ts = now
+                return syms
         except Exception as e:
             logger.error(f"Error fetching futures symbols: {e}")
         return self._futures_symbols_cache
@@ -110,22 +148,20 @@ class DataFetcher:
     # ─── OHLCV ───────────────────────────────────────────────────────────────
     async def get_klines(self, symbol: str, interval: str, limit: int = 200) -> pd.DataFrame:
         """Fetch OHLCV klines from Binance Futures"""
-        session = await self._get_session()
         params = {"symbol": symbol, "interval": interval, "limit": limit}
         try:
-            async with session.get(f"{BINANCE_BASE}/fapi/v1/klines", params=params) as resp:
-                if resp.status == 200:
-                    raw = await resp.json()
-                    df = pd.DataFrame(raw, columns=[
-                        "open_time","open","high","low","close","volume",
-                        "close_time","quote_vol","trades","taker_buy_base",
-                        "taker_buy_quote","ignore"
-                    ])
-                    for col in ["open","high","low","close","volume","quote_vol","taker_buy_base","taker_buy_quote"]:
-                        df[col] = pd.to_numeric(df[col])
-                    df["open_time"] = pd.to_datetime(df["open_time"], unit="ms")
-                    df.set_index("open_time", inplace=True)
-                    return df
+            raw = await self._binance_get("/fapi/v1/klines", params)
+            if raw:
+                df = pd.DataFrame(raw, columns=[
+                    "open_time","open","high","low","close","volume",
+                    "close_time","quote_vol","trades","taker_buy_base",
+                    "taker_buy_quote","ignore"
+                ])
+                for col in ["open","high","low","close","volume","quote_vol","taker_buy_base","taker_buy_quote"]:
+                    df[col] = pd.to_numeric(df[col])
+                df["open_time"] = pd.to_datetime(df["open_time"], unit="ms")
+                df.set_index("open_time", inplace=True)
+                return df
         except Exception as e:
             logger.error(f"Klines error {symbol} {interval}: {e}")
         return pd.DataFrame()
@@ -133,28 +169,22 @@ class DataFetcher:
     # ─── Open Interest ────────────────────────────────────────────────────────
     async def get_open_interest(self, symbol: str) -> dict:
         """Fetch current OI"""
-        session = await self._get_session()
         try:
-            async with session.get(f"{BINANCE_BASE}/fapi/v1/openInterest", params={"symbol": symbol}) as resp:
-                if resp.status == 200:
-                    return await resp.json()
+            return await self._binance_get("/fapi/v1/openInterest", {"symbol": symbol}) or {}
         except Exception as e:
             logger.error(f"OI error {symbol}: {e}")
         return {}
 
     async def get_oi_history(self, symbol: str, period: str = "5m", limit: int = 50) -> pd.DataFrame:
         """OI historical data"""
-        session = await self._get_session()
         params = {"symbol": symbol, "period": period, "limit": limit}
         try:
-            async with session.get(f"{BINANCE_BASE}/futures/data/openInterestHist", params=params) as resp:
-                if resp.status == 200:
-                    raw = await resp.json()
-                    if raw:
-                        df = pd.DataFrame(raw)
-                        df["sumOpenInterest"] = pd.to_numeric(df["sumOpenInterest"])
-                        df["sumOpenInterestValue"] = pd.to_numeric(df["sumOpenInterestValue"])
-                        return df
+            raw = await self._binance_get("/futures/data/openInterestHist", params)
+            if raw:
+                df = pd.DataFrame(raw)
+                df["sumOpenInterest"] = pd.to_numeric(df["sumOpenInterest"])
+                df["sumOpenInterestValue"] = pd.to_numeric(df["sumOpenInterestValue"])
+                return df
         except Exception as e:
             logger.error(f"OI history error {symbol}: {e}")
         return pd.DataFrame()
@@ -162,12 +192,10 @@ class DataFetcher:
     # ─── Funding Rate ─────────────────────────────────────────────────────────
     async def get_funding_rate(self, symbol: str) -> float:
         """Get current funding rate"""
-        session = await self._get_session()
         try:
-            async with session.get(f"{BINANCE_BASE}/fapi/v1/premiumIndex", params={"symbol": symbol}) as resp:
-                if resp.status == 200:
-                    data = await resp.json()
-                    return float(data.get("lastFundingRate", 0))
+            data = await self._binance_get("/fapi/v1/premiumIndex", {"symbol": symbol})
+            if data is not None:
+                return float(data.get("lastFundingRate", 0))
         except Exception as e:
             logger.error(f"Funding rate error {symbol}: {e}")
         return 0.0
@@ -175,12 +203,9 @@ class DataFetcher:
     # ─── Liquidation Data ────────────────────────────────────────────────────
     async def get_recent_liquidations(self, symbol: str = "BTCUSDT", limit: int = 20) -> list:
         """Get recent liquidation orders"""
-        session = await self._get_session()
         params = {"symbol": symbol, "limit": limit}
         try:
-            async with session.get(f"{BINANCE_BASE}/fapi/v1/allForceOrders", params=params) as resp:
-                if resp.status == 200:
-                    return await resp.json()
+            return await self._binance_get("/fapi/v1/allForceOrders", params) or []
         except Exception as e:
             logger.error(f"Liquidations error {symbol}: {e}")
         return []
@@ -211,14 +236,11 @@ class DataFetcher:
     # ─── Volume Profile ───────────────────────────────────────────────────────
     async def get_taker_buy_sell_ratio(self, symbol: str, period: str = "5m", limit: int = 20) -> pd.DataFrame:
         """Long/Short taker ratio"""
-        session = await self._get_session()
         params = {"symbol": symbol, "period": period, "limit": limit}
         try:
-            async with session.get(f"{BINANCE_BASE}/futures/data/takerlongshortRatio", params=params) as resp:
-                if resp.status == 200:
-                    raw = await resp.json()
-                    if raw:
-                        return pd.DataFrame(raw)
+            raw = await self._binance_get("/futures/data/takerlongshortRatio", params)
+            if raw:
+                return pd.DataFrame(raw)
         except Exception as e:
             logger.error(f"Taker ratio error {symbol}: {e}")
         return pd.DataFrame()
@@ -235,28 +257,23 @@ class DataFetcher:
 
     async def get_ticker_24h(self, symbol: str) -> dict:
         """24h ticker statistics"""
-        session = await self._get_session()
         try:
-            async with session.get(f"{BINANCE_BASE}/fapi/v1/ticker/24hr", params={"symbol": symbol}) as resp:
-                if resp.status == 200:
-                    return await resp.json()
+            return await self._binance_get("/fapi/v1/ticker/24hr", {"symbol": symbol}) or {}
         except Exception as e:
             logger.error(f"Ticker 24h error {symbol}: {e}")
         return {}
 
     async def get_orderbook_imbalance(self, symbol: str, limit: int = 20) -> float:
         """Calculate bid/ask volume imbalance (-1 to 1, positive = bullish)"""
-        session = await self._get_session()
         try:
-            async with session.get(f"{BINANCE_BASE}/fapi/v1/depth", params={"symbol": symbol, "limit": limit}) as resp:
-                if resp.status == 200:
-                    data = await resp.json()
-                    bid_vol = sum(float(b[1]) for b in data.get("bids", []))
-                    ask_vol = sum(float(a[1]) for a in data.get("asks", []))
-                    total = bid_vol + ask_vol
-                    if total == 0:
-                        return 0.0
-                    return (bid_vol - ask_vol) / total
+            data = await self._binance_get("/fapi/v1/depth", {"symbol": symbol, "limit": limit})
+            if data is not None:
+                bid_vol = sum(float(b[1]) for b in data.get("bids", []))
+                ask_vol = sum(float(a[1]) for a in data.get("asks", []))
+                total = bid_vol + ask_vol
+                if total == 0:
+                    return 0.0
+                return (bid_vol - ask_vol) / total
         except Exception as e:
             logger.error(f"Orderbook error {symbol}: {e}")
         return 0.0
@@ -13,15 +13,61 @@ def ema(series: pd.Series, period: int) -> pd.Series:
 def sma(series: pd.Series, period: int) -> pd.Series:
     return series.rolling(period).mean()
 
-def rsi(series: pd.Series, period: int = 14) -> pd.Series:
-    delta = series.diff()
-    gain = delta.clip(lower=0)
-    loss = -delta.clip(upper=0)
-    avg_gain = gain.ewm(com=period - 1, min_periods=period).mean()
-    avg_loss = loss.ewm(com=period - 1, min_periods=period).mean()
-    rs = avg_gain / avg_loss.replace(0, np.nan)
+def _wilder_mean(x: np.ndarray, period: int) -> np.ndarray:
+    """
+    NumPy equivalent of Series.ewm(com=period-1, min_periods=period).mean() for an
+    array whose only NaNs are leading (e.g. from diff()).
+
+    With adjust=True each output is a weighted mean with weights decay**(t-i);
+    dividing numerator and denominator by decay**t turns both into plain cumsums.
+    """
+    out = np.full(len(x), np.nan)
+    valid = ~np.isnan(x)
+    if not valid.any():
+        return out
+    start = int(valid.argmax())
+    v = x[start:]
+    n = len(v)
+    if n < period:
+        return out
+    decay = 1.0 - 1.0 / period
+    if n * -np.log(decay) > 700:  # decay**-n would overflow — very long series only
+        return pd.Series(x).ewm(com=period - 1, min_periods=period).mean().to_numpy()
+    growth = decay ** -np.arange(n, dtype=np.float64)
+    means = np.cumsum(v * growth) / np.cumsum(growth)
+    out[start + period - 1:] = means[period - 1:]
+    return out
+
+def _rsi_np(close: np.ndarray, period: int) -> np.ndarray:
+    delta = np.diff(close, prepend=np.nan)
+    avg_gain = _wilder_mean(np.clip(delta, 0, None), period)
+    avg_loss = _wilder_mean(np.clip(-delta, 0, None), period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = avg_gain / np.where(avg_loss == 0, np.nan, avg_loss)
     return 100 - (100 / (1 + rs))
 
+def rsi(series: pd.Series, period: int = 14) -> pd.Series:
+    return pd.Series(_rsi_np(series.to_numpy(dtype=np.float64), period), index=series.index)
+
+def _ema_np(x: np.ndarray, span: int) -> np.ndarray:
+    """
+    NumPy equivalent of Series.ewm(span=span, adjust=False).mean().
+    y[t] = decay*y[t-1] + alpha*x[t] unrolls to decay**t * (x[0] + alpha*cumsum(x[i]*decay**-i)).
+    """
+    n = len(x)
+    alpha = 2.0 / (span + 1)
+    decay = 1.0 - alpha
+    if n == 0 or decay == 0:
+        return x.astype(np.float64, copy=True)
+    if np.ptp(x) == 0:  # flat input — the closed form leaves ~1e-12 residue where pandas is exact
+        return np.full(n, x[0], dtype=np.float64)
+    if n * -np.log(decay) > 700 or np.isnan(x).any():  # overflow / NaN handling — defer to pandas
+        return pd.Series(x).ewm(span=span, adjust=False).mean().to_numpy()
+    growth = decay ** -np.arange(n, dtype=np.float64)
+    acc = alpha * np.cumsum(x * growth)
+    acc += x[0] * (1.0 - alpha)  # x[0] enters with weight 1, not alpha
+    return acc / growth
+
 def macd(series: pd.Series, fast=12, slow=26, signal=9):
     fast_ema = ema(series, fast)
     slow_ema = ema(series, slow)
@@ -37,16 +83,17 @@ def bollinger_bands(series: pd.Series, period=20, std_dev=2):
     lower = mid - std_dev * std
     return upper, mid, lower
 
+def _true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    tr = high - low
+    prev = close[:-1]
+    tr[1:] = np.maximum(tr[1:], np.maximum(np.abs(high[1:] - prev), np.abs(low[1:] - prev)))
+    return tr
+
 def atr(df: pd.DataFrame, period=14) -> pd.Series:
-    high = df["high"]
-    low  = df["low"]
-    close = df["close"]
-    tr = pd.concat([
-        high - low,
-        (high - close.shift()).abs(),
-        (low  - close.shift()).abs()
-    ], axis=1).max(axis=1)
-    return tr.ewm(com=period-1, min_periods=period).mean()
+    tr = _true_range(df["high"].to_numpy(dtype=np.float64),
+                     df["low"].to_numpy(dtype=np.float64),
+                     df["close"].to_numpy(dtype=np.float64))
+    return pd.Series(_wilder_mean(tr, period), index=df.index)
 
 def stochastic_rsi(rsi_series: pd.Series, period=14) -> tuple[pd.Series, pd.Series]:
     min_rsi = rsi_series.rolling(period).min()
@@ -66,39 +113,52 @@ def volume_profile_poc(df: pd.DataFrame, bins=50) -> float:
     """Point of Control - price level with most volume"""
     if df.empty:
         return 0.0
-    price_bins = pd.cut(df["close"], bins=bins)
-    vol_by_price = df.groupby(price_bins, observed=False)["volume"].sum()
-    if vol_by_price.empty:
+    close  = df["close"].to_numpy(dtype=np.float64)
+    volume = df["volume"].to_numpy(dtype=np.float64)
+    ok = ~np.isnan(close)
+    if not ok.any():
         return 0.0
-    poc_bin = vol_by_price.idxmax()
-    if poc_bin is pd.NaT or poc_bin is None:
-        return float(df["close"].mean())
-    return float(poc_bin.mid)
+    close, volume = close[ok], volume[ok]
+    # Same equal-width, right-closed bins as pd.cut(close, bins)
+    mn, mx = close.min(), close.max()
+    if mn == mx:
+        mn -= 0.001 * abs(mn) if mn != 0 else 0.001
+        mx += 0.001 * abs(mx) if mx != 0 else 0.001
+        edges = np.linspace(mn, mx, bins + 1)
+    else:
+        edges = np.linspace(mn, mx, bins + 1)
+        edges[0] -= (mx - mn) * 0.001
+    idx = np.clip(np.searchsorted(edges, close, side="left") - 1, 0, bins - 1)
+    vol_by_price = np.bincount(idx, weights=np.nan_to_num(volume), minlength=bins)
+    poc_bin = int(vol_by_price.argmax())
+    return float((edges[poc_bin] + edges[poc_bin + 1]) / 2)
 
 def supertrend(df: pd.DataFrame, period=10, multiplier=3.0):
     """Supertrend indicator"""
-    atr_vals = atr(df, period)
-    hl2 = (df["high"] + df["low"]) / 2
+    high  = df["high"].to_numpy(dtype=np.float64)
+    low   = df["low"].to_numpy(dtype=np.float64)
+    close = df["close"].to_numpy(dtype=np.float64)
+    atr_vals = _wilder_mean(_true_range(high, low, close), period)
+    hl2 = (high + low) / 2
     upper_band = hl2 + multiplier * atr_vals
     lower_band = hl2 - multiplier * atr_vals
 
-    supertrend = pd.Series(index=df.index, dtype=float)
-    direction = pd.Series(index=df.index, dtype=int)
-
-    for i in range(1, len(df)):
-        if df["close"].iloc[i] > upper_band.iloc[i-1]:
-            direction.iloc[i] = 1
-        elif df["close"].iloc[i] < lower_band.iloc[i-1]:
-            direction.iloc[i] = -1
-        else:
-            direction.iloc[i] = direction.iloc[i-1] if i > 0 else 1
-
-        if direction.iloc[i] == 1:
-            supertrend.iloc[i] = lower_band.iloc[i]
-        else:
-            supertrend.iloc[i] = upper_band.iloc[i]
-
-    return supertrend, direction
+    # The direction carry is inherently sequential — run it over plain floats, not .iloc
+    n = len(close)
+    st_out  = [np.nan] * n
+    dir_out = [np.nan] * n
+    closes, uppers, lowers = close.tolist(), upper_band.tolist(), lower_band.tolist()
+    d = np.nan
+    for i in range(1, n):
+        c = closes[i]
+        if c > uppers[i-1]:
+            d = 1.0
+        elif c < lowers[i-1]:
+            d = -1.0
+        dir_out[i] = d
+        st_out[i]  = lowers[i] if d == 1 else uppers[i]
+
+    return pd.Series(st_out, index=df.index, dtype=float), pd.Series(dir_out, index=df.index, dtype=float)
 
 def ichimoku(df: pd.DataFrame):
     """Ichimoku Cloud components"""
@@ -134,15 +194,15 @@ def pivot_points(df: pd.DataFrame) -> dict:
         "s3": round(l - 2 * (h - pivot), 4),
     }
 
-def detect_divergence(price: pd.Series, indicator: pd.Series, lookback: int = 5) -> str:
-    """Detect RSI/MACD divergence. Returns: 'bullish', 'bearish', or 'none'"""
+def detect_divergence(price, indicator, lookback: int = 5) -> str:
+    """Detect RSI/MACD divergence (Series or arrays). Returns: 'bullish', 'bearish', or 'none'"""
     if len(price) < lookback + 1:
         return "none"
-    recent_price = price.iloc[-lookback:]
-    recent_ind   = indicator.iloc[-lookback:]
+    recent_price = np.asarray(price)[-lookback:]
+    recent_ind   = np.asarray(indicator)[-lookback:]
 
-    price_higher = recent_price.iloc[-1] > recent_price.iloc[0]
-    ind_higher   = recent_ind.iloc[-1] > recent_ind.iloc[0]
+    price_higher = recent_price[-1] > recent_price[0]
+    ind_higher   = recent_ind[-1] > recent_ind[0]
 
     if price_higher and not ind_higher:
         return "bearish"
@@ -186,27 +246,53 @@ def detect_patterns(df: pd.DataFrame) -> list[str]:
     return patterns
 
 
+def _last(x, default) -> float:
+    v = float(x)
+    return default if np.isnan(v) else v
+
+
 def calculate_all_indicators(df: pd.DataFrame) -> dict:
     """Compute all indicators and return as dict of latest values"""
     if df.empty or len(df) < 50:
         return {}
 
-    close = df["close"]
-    volume = df["volume"]
-
-    rsi14        = rsi(close, 14)
-    rsi7         = rsi(close, 7)
-    macd_l, macd_s, macd_h = macd(close)
-    bb_u, bb_m, bb_l = bollinger_bands(close)
-    atr14        = atr(df, 14)
-    stoch_k, stoch_d = stochastic_rsi(rsi14)
-    vwap_val     = vwap(df)
-    ema9         = ema(close, 9)
-    ema21        = ema(close, 21)
-    ema50        = ema(close, 50)
-    ema200       = ema(close, 200) if len(df) >= 200 else ema(close, len(df))
-    vol_sma20    = sma(volume, 20)
-    vol_sma5     = sma(volume, 5)
+    # Pull the columns out once; everything below works on raw float64 arrays
+    close  = df["close"].to_numpy(dtype=np.float64)
+    high   = df["high"].to_numpy(dtype=np.float64)
+    low    = df["low"].to_numpy(dtype=np.float64)
+    volume = df["volume"].to_numpy(dtype=np.float64)
+    n = len(close)
+
+    rsi14   = _rsi_np(close, 14)
+    rsi7    = _rsi_np(close, 7)
+    ema9    = _ema_np(close, 9)
+    ema21   = _ema_np(close, 21)
+    ema50   = _ema_np(close, 50)
+    ema200  = _ema_np(close, 200 if n >= 200 else n)
+    macd_l  = _ema_np(close, 12) - _ema_np(close, 26)
+    macd_s  = _ema_np(macd_l, 9)
+    macd_h  = macd_l - macd_s
+    atr14   = _wilder_mean(_true_range(high, low, close), 14)
+
+    # Bollinger (20, 2) — only the latest window matters
+    bb_win  = close[-20:]
+    bb_m    = bb_win.mean()
+    bb_std  = bb_win.std(ddof=1)
+
+    # Stoch RSI (14, 3, 3): rolling min/max over the last 5 RSI windows → K over 3 → D over 3
+    rsi_win = np.lib.stride_tricks.sliding_window_view(rsi14[-18:], 14)
+    stoch   = (rsi_win[:, -1] - rsi_win.min(axis=1)) / (rsi_win.max(axis=1) - rsi_win.min(axis=1) + 1e-9)
+    k_vals  = np.lib.stride_tricks.sliding_window_view(stoch, 3).mean(axis=1) * 100
+    stoch_k = k_vals[-1]
+    stoch_d = k_vals.mean()
+
+    tp        = (high + low + close) / 3
+    vwap_val  = (tp * volume).sum() / volume.sum()
+
+    # OBV
+    obv_step = np.nan_to_num(np.sign(np.diff(close)) * volume[1:])
+    obv      = obv_step.sum()
+    obv_prev = obv - obv_step[-1]
 
     divergence_rsi  = detect_divergence(close, rsi14)
     divergence_macd = detect_divergence(close, macd_h)
@@ -214,35 +300,32 @@ def calculate_all_indicators(df: pd.DataFrame) -> dict:
     pivots          = pivot_points(df)
     poc             = volume_profile_poc(df.tail(50))
 
-    # OBV
-    obv = (np.sign(close.diff()) * volume).fillna(0).cumsum()
-
-    curr_price = float(close.iloc[-1])
+    curr_price = float(close[-1])
 
     return {
         "price":          curr_price,
-        "rsi14":          float(rsi14.iloc[-1]) if not pd.isna(rsi14.iloc[-1]) else 50,
-        "rsi7":           float(rsi7.iloc[-1]) if not pd.isna(rsi7.iloc[-1]) else 50,
-        "macd_line":      float(macd_l.iloc[-1]) if not pd.isna(macd_l.iloc[-1]) else 0,
-        "macd_signal":    float(macd_s.iloc[-1]) if not pd.isna(macd_s.iloc[-1]) else 0,
-        "macd_hist":      float(macd_h.iloc[-1]) if not pd.isna(macd_h.iloc[-1]) else 0,
-        "macd_hist_prev": float(macd_h.iloc[-2]) if not pd.isna(macd_h.iloc[-2]) else 0,
-        "bb_upper":       float(bb_u.iloc[-1]) if not pd.isna(bb_u.iloc[-1]) else curr_price * 1.02,
-        "bb_mid":         float(bb_m.iloc[-1]) if not pd.isna(bb_m.iloc[-1]) else curr_price,
-        "bb_lower":       float(bb_l.iloc[-1]) if not pd.isna(bb_l.iloc[-1]) else curr_price * 0.98,
-        "atr14":          float(atr14.iloc[-1]) if not pd.isna(atr14.iloc[-1]) else curr_price * 0.01,
-        "stoch_k":        float(stoch_k.iloc[-1]) if not pd.isna(stoch_k.iloc[-1]) else 50,
-        "stoch_d":        float(stoch_d.iloc[-1]) if not pd.isna(stoch_d.iloc[-1]) else 50,
-        "vwap":           float(vwap_val.iloc[-1]) if not pd.isna(vwap_val.iloc[-1]) else curr_price,
-        "ema9":           float(ema9.iloc[-1]),
-        "ema21":          float(ema21.iloc[-1]),
-        "ema50":          float(ema50.iloc[-1]),
-        "ema200":         float(ema200.iloc[-1]),
-        "vol_current":    float(volume.iloc[-1]),
-        "vol_sma20":      float(vol_sma20.iloc[-1]) if not pd.isna(vol_sma20.iloc[-1]) else 1,
-        "vol_sma5":       float(vol_sma5.iloc[-1]) if not pd.isna(vol_sma5.iloc[-1]) else 1,
-        "obv":            float(obv.iloc[-1]),
-        "obv_prev":       float(obv.iloc[-2]),
+        "rsi14":          _last(rsi14[-1], 50),
+        "rsi7":           _last(rsi7[-1], 50),
+        "macd_line":      _last(macd_l[-1], 0),
+        "macd_signal":    _last(macd_s[-1], 0),
+        "macd_hist":      _last(macd_h[-1], 0),
+        "macd_hist_prev": _last(macd_h[-2], 0),
+        "bb_upper":       _last(bb_m + 2 * bb_std, curr_price * 1.02),
+        "bb_mid":         _last(bb_m, curr_price),
+        "bb_lower":       _last(bb_m - 2 * bb_std, curr_price * 0.98),
+        "atr14":          _last(atr14[-1], curr_price * 0.01),
+        "stoch_k":        _last(stoch_k, 50),
+        "stoch_d":        _last(stoch_d, 50),
+        "vwap":           _last(vwap_val, curr_price),
+        "ema9":           float(ema9[-1]),
+        "ema21":          float(ema21[-1]),
+        "ema50":          float(ema50[-1]),
+        "ema200":         float(ema200[-1]),
+        "vol_current":    float(volume[-1]),
+        "vol_sma20":      _last(volume[-20:].mean(), 1),
+        "vol_sma5":       _last(volume[-5:].mean(), 1),
+        "obv":            float(obv),
+        "obv_prev":       float(obv_prev),
         "divergence_rsi": divergence_rsi,
         "divergence_macd":divergence_macd,
         "patterns":       patterns,